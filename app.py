@@ -1,17 +1,137 @@
-from flask import Flask, render_template, request, jsonify
+import os
+
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    jsonify,
+    url_for,
+    send_from_directory,
+)
+from werkzeug.security import safe_join
 
 # Import utility modules
-from utils.crawler import extract_website_content, extract_social_links
-from utils.socials import extract_social_content  # Updated import path
-from utils.analyzer import analyze_content
-from utils.llm_providers import generate_brand_story  # Updated import path
-from utils.visuals import (
-    generate_visual_profile,
-    generate_consistency_score,
-)  # Updated import path
+from utils.pipeline import analyze_url
+from utils.crawler import normalize_url
+from utils.jobs import JobManager
+from utils.workqueue import WorkQueue, MAX_DEPTH
+from utils.admission import AdmissionController, Overloaded
+from utils.singleflight import coalescing_stats
+from utils.llm_providers import ROUTER
+from utils.reports import get_representation, choose_encoding, save_report
+from utils.assets import ASSET_MAX_AGE, asset_hash, hashed_name, split_hashed
+
+# Longest a client may block on GET /jobs/<id>?wait=N
+MAX_LONG_POLL = 30
+# Retry-After hint when the shared work queue is full (seconds)
+QUEUE_FULL_RETRY_AFTER = 30
+
+# Content types of the report parts served by GET /report/<id>
+REPORT_MIMETYPES = {"json": "application/json", "story": "text/markdown"}
+
+# Initialize Flask app; static files get their own route so fingerprinted names can be cached
+app = Flask(__name__, static_folder=None)
+STATIC_DIR = os.path.join(app.root_path, "static")
+jobs = JobManager()
+admission = AdmissionController()
+# With NARRATIX_QUEUE_PATH set, async analyses go to the shared work queue and
+# are run by worker.py processes (possibly on other hosts) instead of this one
+work_queue = WorkQueue() if os.environ.get("NARRATIX_QUEUE_PATH") else None
+
+# Queue states as reported by GET /jobs/<id>
+QUEUE_STATUSES = {"queued": "queued", "leased": "running", "done": "done", "dead": "error"}
+
+
+def client_id():
+    """Identify the caller for per-client quotas"""
+    return request.headers.get("X-Client-Id") or request.remote_addr
+
+
+def overloaded_response(error):
+    return (
+        jsonify({"error": str(error), "retry_after": error.retry_after}),
+        429,
+        {"Retry-After": str(error.retry_after)},
+    )
+
+
+def queued_job_dict(job):
+    """Present a work-queue job in the same shape as an in-process job"""
+    data = {
+        "job_id": job["job_id"],
+        "url": job["payload"]["url"],
+        "status": QUEUE_STATUSES[job["status"]],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["status"] == "done":
+        data["result"] = job["result"]
+        # Workers write reports to the shared DB; only save one this node can't see
+        # (found reports are cached, so repeated polls don't touch SQLite)
+        report_id = job["result"].get("report_id")
+        if report_id and get_representation(report_id, "json") is None:
+            save_report(data["url"], job["result"])
+    elif job["status"] == "dead":
+        data["error"] = job["error"]
+    return data
+
+
+def run_admitted(ticket, url):
+    """Run a queued analysis once the admission ticket gets a running slot"""
+    ticket.start()
+    try:
+        return analyze_url(url, degraded=ticket.degraded)
+    finally:
+        ticket.release()
+
+
+def report_response(report_id, part):
+    """Serve a stored report part with a strong ETag, compression and 304 handling"""
+    body = get_representation(report_id, part)
+    if body is None:
+        return jsonify({"error": "Unknown report"}), 404
+
+    encoding = choose_encoding(request.accept_encodings, len(body))
+    # Each encoding is a different representation, so it gets its own strong ETag
+    etag = f"{report_id}-{part}-{encoding}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(
+            get_representation(report_id, part, encoding), mimetype=REPORT_MIMETYPES[part]
+        )
+        if encoding != "identity":
+            response.content_encoding = encoding
 
-# Initialize Flask app
-app = Flask(__name__)
+    # Report ids are content hashes, so a report never changes
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = ASSET_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+@app.template_global()
+def static_url(filename):
+    """URL of a static file with its content hash in the name"""
+    return url_for("static", filename=hashed_name(STATIC_DIR, filename))
+
+
+@app.route("/static/<path:filename>", endpoint="static")
+def static_files(filename):
+    """Serve static files; fingerprinted names are cached for a year"""
+    original, digest = split_hashed(filename)
+    path = safe_join(STATIC_DIR, original)
+    if digest and path and os.path.isfile(path) and asset_hash(path) == digest:
+        response = send_from_directory(STATIC_DIR, original, max_age=ASSET_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+    # Plain or outdated names are revalidated on every use
+    return send_from_directory(STATIC_DIR, original, max_age=0)
 
 
 @app.route("/")
@@ -21,57 +141,91 @@ def index():
 
 @app.route("/analyze", methods=["POST"])
 def analyze_website():
-    """Analyze a website and generate a brand story"""
+    """Analyze a website and generate a brand story
+
+    With {"async": true} in the body (or ?async=1) the analysis is queued and
+    a job id is returned immediately; poll GET /jobs/<id> for the result.
+    """
     data = request.get_json()
     url = data.get("url", "").strip()
 
     if not url:
         return jsonify({"error": "URL is required"}), 400
 
-    # Normalize URL
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
+    if work_queue and (data.get("async") or request.args.get("async") == "1"):
+        # Running capacity is the worker fleet's, but quotas and queue depth apply here
+        try:
+            admission.check_quota(client_id())
+            if work_queue.depth() >= MAX_DEPTH:
+                raise Overloaded("Work queue is full", QUEUE_FULL_RETRY_AFTER)
+        except Overloaded as e:
+            return overloaded_response(e)
+        job_id = work_queue.enqueue({"url": normalize_url(url)})
+        status_url = url_for("job_status", job_id=job_id)
+        response = jsonify({**queued_job_dict(work_queue.get(job_id)), "status_url": status_url})
+        return response, 202, {"Location": status_url}
+
+    if data.get("async") or request.args.get("async") == "1":
+        try:
+            ticket = admission.acquire(client_id(), wait=False)
+        except Overloaded as e:
+            return overloaded_response(e)
+        job = jobs.submit(normalize_url(url), run_admitted, ticket, url)
+        status_url = url_for("job_status", job_id=job.id)
+        response = jsonify({**job.to_dict(), "status_url": status_url})
+        return response, 202, {"Location": status_url}
 
     try:
-        # Simple workflow: Extract → Analyze → Generate
-        website_content = extract_website_content(url)
-        social_links = extract_social_links(url)
-        social_content = extract_social_content(social_links)
-        analysis = analyze_content(website_content, social_content)
-
-        # Generate outputs
-        brand_name = website_content.get("brand_name", "Brand")
-        brand_story = generate_brand_story(
-            brand_name, website_content.get("description", ""), analysis, social_content
-        )
-        visual_profile = generate_visual_profile(analysis)
-        consistency_score = generate_consistency_score(
-            website_content, social_content, analysis
-        )
+        ticket = admission.acquire(client_id())
+    except Overloaded as e:
+        return overloaded_response(e)
 
-        # Return results
-        return jsonify(
-            {
-                "brand_name": brand_name,
-                "brand_description": website_content.get("description", ""),
-                "social_links": social_links,
-                "social_analytics": [
-                    {
-                        "platform": s["platform"],
-                        "followers": s.get("followers", "N/A"),
-                        "engagement": s.get("engagement", "Medium"),
-                    }
-                    for s in social_content
-                ],
-                "keywords": analysis.get("keywords", []),
-                "key_values": analysis.get("key_values", []),
-                "brand_story": brand_story,
-                "visual_profile": visual_profile,
-                "consistency_score": consistency_score,
-            }
-        )
+    try:
+        # Concurrent requests for the same URL share a single pipeline run
+        return jsonify(analyze_url(url, degraded=ticket.degraded))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    finally:
+        ticket.release()
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Return the state of an analysis job, waiting up to ?wait=N seconds for it to finish"""
+    wait = min(max(request.args.get("wait", 0, type=float), 0), MAX_LONG_POLL)
+    job = jobs.wait(job_id, wait)
+    if job is not None:
+        return jsonify(job.to_dict())
+    queued = work_queue.wait(job_id, wait) if work_queue else None
+    if queued is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(queued_job_dict(queued))
+
+
+@app.route("/report/<report_id>")
+def report(report_id):
+    """A stored analysis result as JSON"""
+    return report_response(report_id, "json")
+
+
+@app.route("/report/<report_id>/story.md")
+def report_story(report_id):
+    """A stored analysis's brand story as markdown"""
+    return report_response(report_id, "story")
+
+
+@app.route("/status")
+def status():
+    """Operational counters for the analysis service"""
+    return jsonify(
+        {
+            "coalescing": coalescing_stats(),
+            "jobs": jobs.stats(),
+            "admission": admission.stats(),
+            "llm_routing": ROUTER.snapshot(),
+            "work_queue": work_queue.stats() if work_queue else None,
+        }
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Throughput benchmark for social link classification on link-heavy pages.
+
+Compares the compiled platform registry used by the crawler with the
+previous approach (per-call regex table, re.search per link per platform).
+Run from the repository root: python benchmarks/bench_platform_registry.py
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.socials.common import classify_url  # noqa: E402
+
+LINKS_PER_PAGE = 5000
+PAGES = 20
+
+SAMPLE_LINKS = [
+    "https://www.example.com/products/item-{}",
+    "https://cdn.example.com/assets/img-{}.png",
+    "https://blog.example.com/2024/post-{}",
+    "https://www.box.com/s/{}",
+    "https://www..facebook.com/broken-{}",  # Malformed host with an empty label
+    "https://dropbox.com/files/{}",
+    "https://partner-{}.co.uk/about",
+]
+SOCIAL_LINKS = [
+    "https://www.facebook.com/brand{}",
+    "https://twitter.com/brand{}",
+    "https://x.com/brand{}",
+    "https://www.instagram.com/brand{}/",
+    "https://www.linkedin.com/company/brand{}",
+    "https://www.youtube.com/@brand{}",
+    "https://www.tiktok.com/@brand{}",
+]
+
+
+def make_page(rng):
+    """Build one page worth of absolute hrefs, roughly 1% social links"""
+    links = []
+    for i in range(LINKS_PER_PAGE):
+        template = rng.choice(SOCIAL_LINKS if rng.random() < 0.01 else SAMPLE_LINKS)
+        links.append(template.format(i))
+    return links
+
+
+def legacy_extract(links):
+    """The pre-registry classification loop from extract_social_links"""
+    platform_patterns = {
+        "facebook": r"facebook\.com|fb\.com",
+        "twitter": r"twitter\.com|x\.com",
+        "instagram": r"instagram\.com",
+        "linkedin": r"linkedin\.com",
+        "youtube": r"youtube\.com|youtu\.be",
+        "pinterest": r"pinterest\.com",
+        "tiktok": r"tiktok\.com",
+    }
+    found = {}
+    for href in links:
+        for platform, pattern in platform_patterns.items():
+            if platform in found:
+                continue
+            if re.search(pattern, href, re.IGNORECASE):
+                found[platform] = href
+    return found
+
+
+def registry_extract(links):
+    """Classification loop as used by extract_social_links today"""
+    found = {}
+    for href in links:
+        match = classify_url(href)
+        if match and match.platform not in found:
+            found[match.platform] = href
+    return found
+
+
+def bench(name, fn, pages):
+    start = time.perf_counter()
+    for links in pages:
+        result = fn(links)
+    elapsed = time.perf_counter() - start
+    total = LINKS_PER_PAGE * len(pages)
+    print(f"{name:<10} {total / elapsed:>12,.0f} links/s   {elapsed * 1000 / len(pages):8.2f} ms/page")
+    return result
+
+
+def main():
+    rng = random.Random(42)
+    pages = [make_page(rng) for _ in range(PAGES)]
+    print(f"{PAGES} pages x {LINKS_PER_PAGE} links")
+    legacy = bench("legacy", legacy_extract, pages)
+    registry = bench("registry", registry_extract, pages)
+    print(f"legacy platforms:   {sorted(legacy)}")
+    print(f"registry platforms: {sorted(registry)}")
+
+
+if __name__ == "__main__":
+    main()
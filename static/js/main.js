@@ -80,13 +80,13 @@ document.addEventListener("DOMContentLoaded", function () {
       }
     }, 300);
 
-    // Send request to backend
+    // Queue the analysis and long-poll the job until it finishes
     fetch("/analyze", {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify({ url: url }),
+      body: JSON.stringify({ url: url, async: true }),
     })
       .then((response) => {
         if (!response.ok) {
@@ -94,6 +94,7 @@ document.addEventListener("DOMContentLoaded", function () {
         }
         return response.json();
       })
+      .then((job) => pollJob(job.status_url))
       .then((data) => {
         // Complete progress bar
         progressBarFill.style.width = "100%";
@@ -104,6 +105,11 @@ document.addEventListener("DOMContentLoaded", function () {
         // Process and display results
         displayResults(data);
 
+        // Make the result reloadable and shareable without rerunning the analysis
+        if (data.report_id) {
+          history.replaceState(null, "", `?report=${data.report_id}`);
+        }
+
         // Reset loading state
         analyzeBtn.disabled = false;
         loadingSpinner.classList.add("hidden");
@@ -125,6 +131,43 @@ document.addEventListener("DOMContentLoaded", function () {
       });
   });
 
+  // Show a stored report when the page is opened with ?report=<id>
+  const reportId = new URLSearchParams(window.location.search).get("report");
+  if (reportId) {
+    fetch(`/report/${encodeURIComponent(reportId)}`)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error("Report not found");
+        }
+        return response.json();
+      })
+      .then((data) => {
+        displayResults(data);
+        resultSection.classList.remove("hidden");
+      })
+      .catch((error) => console.error("Error:", error));
+  }
+
+  // Wait for an analysis job to finish and resolve with its result
+  function pollJob(statusUrl) {
+    return fetch(`${statusUrl}?wait=25`)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error("Network response was not ok");
+        }
+        return response.json();
+      })
+      .then((job) => {
+        if (job.status === "done") {
+          return job.result;
+        }
+        if (job.status === "error") {
+          throw new Error(job.error);
+        }
+        return pollJob(statusUrl);
+      });
+  }
+
   // Function to display results
   function displayResults(data) {
     // Brand info
@@ -0,0 +1,5 @@
+import os
+
+# The provider modules refuse to import without keys; tests never call the APIs
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
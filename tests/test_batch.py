@@ -0,0 +1,76 @@
+from utils.llm_providers.batch import generate_brand_stories
+
+BRANDS = ["Acme", "Globex", "Initech"]
+
+
+def story(brand):
+    return "\n".join(
+        [
+            f"# {brand}: Brand Story",
+            "## Core Values",
+            "## Brand Voice",
+            "## Social Media",
+            "## Conclusion",
+        ]
+    )
+
+
+def packed(*sections):
+    return "\n".join(
+        f"<<<BRAND {index}>>>\n{text}\n<<<END BRAND {index}>>>"
+        for index, text in enumerate(sections, start=1)
+    )
+
+
+class FakeProvider:
+    """Local stand-in for the LLM providers that records every request"""
+
+    def __init__(self, packed_response=None, single=True):
+        self.packed_response = packed_response
+        self.single = single
+        self.prompts = []
+
+    def __call__(self, prompt, max_tokens=None):
+        self.prompts.append(prompt)
+        if "<<<BRAND n>>>" in prompt:
+            return self.packed_response
+        if not self.single:
+            raise RuntimeError("provider unavailable")
+        brand = next(name for name in BRANDS if name in prompt)
+        return story(brand)
+
+
+def items():
+    return [{"brand_name": brand, "description": f"{brand} makes things"} for brand in BRANDS]
+
+
+def test_packed_response_is_split_per_brand():
+    provider = FakeProvider(packed_response=packed(*(story(brand) for brand in BRANDS)))
+
+    stories, fallback = generate_brand_stories(items(), generator=provider)
+
+    assert stories == [story(brand) for brand in BRANDS]
+    assert fallback == [False, False, False]
+    assert len(provider.prompts) == 1
+
+
+def test_malformed_section_falls_back_to_single_brand_request():
+    response = packed(story("Acme"), "not a story at all", story("Initech"))
+    provider = FakeProvider(packed_response=response)
+
+    stories, fallback = generate_brand_stories(items(), generator=provider)
+
+    assert stories == [story(brand) for brand in BRANDS]
+    assert fallback == [False, False, False]
+    assert len(provider.prompts) == 2
+    assert "Globex" in provider.prompts[1] and "<<<BRAND n>>>" not in provider.prompts[1]
+
+
+def test_total_failure_gives_template_stories():
+    provider = FakeProvider(packed_response=None, single=False)
+
+    stories, fallback = generate_brand_stories(items(), generator=provider)
+
+    assert fallback == [True, True, True]
+    for brand, text in zip(BRANDS, stories):
+        assert text.startswith(f"# {brand}: Brand Story")
@@ -0,0 +1,15 @@
+from utils.socials.common import PLATFORMS
+from utils.socials.registry import PlatformRegistry
+
+REGISTRY = PlatformRegistry(PLATFORMS)
+
+
+def test_subdomains_match_and_lookalike_domains_do_not():
+    assert REGISTRY.classify("https://m.facebook.com/brand").platform == "facebook"
+    assert REGISTRY.classify("https://www.box.com/s/abc") is None
+
+
+def test_hosts_with_empty_labels_are_not_matched():
+    assert REGISTRY.classify("https://www..facebook.com/brand") is None
+    assert REGISTRY.classify("https://.x.com/foo") is None
+    assert REGISTRY.match_host("facebook..com") is None
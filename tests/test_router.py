@@ -0,0 +1,36 @@
+import random
+
+from utils.llm_providers.router import LatencyRouter
+
+
+def simulate(router, behaviour, requests=2000):
+    """Route requests through options with fixed (latency, succeeds) behaviour"""
+    calls = {name: 0 for name in behaviour}
+    for _ in range(requests):
+        for name, _ in router.order():
+            latency, succeeds = behaviour[name]
+            calls[name] += 1
+            router.record(name, latency, succeeds)
+            if succeeds:
+                break
+    return calls
+
+
+def test_fast_failing_option_sinks_below_healthy_option():
+    router = LatencyRouter(
+        [("dead", None), ("healthy", None)], exploration=0.1, rng=random.Random(7)
+    )
+    calls = simulate(router, {"dead": (0.1, False), "healthy": (3.0, True)})
+
+    ranking = [row["option"] for row in router.snapshot()["options"]]
+    assert ranking == ["healthy", "dead"]
+    # Only exploration leads with the dead option
+    assert calls["dead"] < 2000 * 0.15
+
+
+def test_faster_healthy_option_ranks_first():
+    router = LatencyRouter(
+        [("slow", None), ("fast", None)], exploration=0.1, rng=random.Random(7)
+    )
+    simulate(router, {"slow": (4.0, True), "fast": (1.0, True)}, requests=200)
+    assert router.order()[0][0] == "fast"
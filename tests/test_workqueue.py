@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+import utils.workqueue as workqueue
+from utils.workqueue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(workqueue, "RETRY_BACKOFF", 0)
+    return WorkQueue(str(tmp_path / "queue.db"), visibility_timeout=0.2)
+
+
+def test_claimed_job_is_invisible_until_completed(queue):
+    job_id = queue.enqueue({"url": "https://a.com"})
+    job = queue.claim("w1")
+
+    assert job["id"] == job_id and job["attempt"] == 1
+    assert queue.claim("w2") is None
+    assert queue.complete(job_id, "w1", {"brand_name": "A"})
+    assert queue.get(job_id)["status"] == "done"
+    assert queue.get(job_id)["result"] == {"brand_name": "A"}
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_is_ignored(queue):
+    job_id = queue.enqueue({"url": "https://a.com"})
+    queue.claim("w1")
+    time.sleep(0.25)
+
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["attempt"] == 2
+    # The first worker lost its lease: none of its updates may land
+    assert not queue.extend_lease(job_id, "w1")
+    assert not queue.fail(job_id, "w1", "stale")
+    assert not queue.complete(job_id, "w1", {})
+    assert queue.get(job_id)["status"] == "leased"
+    assert queue.complete(job_id, "w2", {})
+
+
+def test_failures_retry_then_dead_letter(queue):
+    job_id = queue.enqueue({"url": "https://a.com"}, max_attempts=2)
+
+    queue.claim("w1")
+    assert queue.fail(job_id, "w1", "boom")
+    assert queue.get(job_id)["status"] == "queued"
+
+    assert queue.claim("w1")["attempt"] == 2
+    assert queue.fail(job_id, "w1", "boom again")
+    assert queue.get(job_id)["status"] == "dead"
+    assert [job["job_id"] for job in queue.dead_letters()] == [job_id]
+
+    assert queue.requeue(job_id)
+    assert queue.stats()["queued"] == 1
+
+
+def test_lease_expiring_on_final_attempt_dead_letters(queue):
+    job_id = queue.enqueue({"url": "https://a.com"}, max_attempts=1)
+    queue.claim("w1")
+    time.sleep(0.25)
+
+    assert queue.claim("w2") is None
+    assert queue.get(job_id)["status"] == "dead"
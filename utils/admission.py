@@ -0,0 +1,205 @@
+import os
+import math
+import time
+import threading
+
+# Analyses allowed to run at once
+MAX_IN_FLIGHT = int(os.environ.get("NARRATIX_MAX_IN_FLIGHT", "8"))
+# Requests allowed to wait for a free slot before new ones are rejected
+MAX_QUEUE = int(os.environ.get("NARRATIX_MAX_QUEUE", "16"))
+# Longest a synchronous request waits in the queue (seconds)
+QUEUE_TIMEOUT = float(os.environ.get("NARRATIX_QUEUE_TIMEOUT", "10"))
+# Load already present when a request starts (running + queued, as a fraction of
+# MAX_IN_FLIGHT) at which that request skips the LLM stage
+DEGRADE_AT = float(os.environ.get("NARRATIX_DEGRADE_AT", "1.0"))
+# Per-client requests per minute, 0 disables quotas
+CLIENT_QUOTA = int(os.environ.get("NARRATIX_CLIENT_QUOTA", "0"))
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; retry_after is in seconds"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request; start() claims a running slot, release() frees it"""
+
+    def __init__(self, controller, running, degraded=False):
+        self._controller = controller
+        self.running = running
+        self.degraded = degraded
+        self.started_at = time.time() if running else None
+        self._released = False
+
+    def start(self):
+        """Wait for a running slot (for tickets admitted into the queue)"""
+        if not self.running:
+            self._controller._start(self)
+        return self
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+
+class _TokenBucket:
+    def __init__(self, rate_per_minute):
+        self.capacity = rate_per_minute
+        self.tokens = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.updated = time.time()
+
+    def take(self):
+        """Consume a token, returning 0 on success or the seconds until one is available"""
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Bounded in-flight limit with a bounded wait queue and optional per-client quotas"""
+
+    def __init__(
+        self,
+        max_in_flight=MAX_IN_FLIGHT,
+        max_queue=MAX_QUEUE,
+        queue_timeout=QUEUE_TIMEOUT,
+        degrade_at=DEGRADE_AT,
+        client_quota=CLIENT_QUOTA,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.degrade_at = degrade_at
+        self.client_quota = client_quota
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self.degraded = 0
+        self._avg_duration = 10.0
+        self._buckets = {}
+        self._cond = threading.Condition()
+
+    def acquire(self, client_id=None, wait=True):
+        """Admit a request or raise Overloaded
+
+        With wait=True the caller blocks in the queue (up to queue_timeout) and
+        gets a running ticket. With wait=False a queued ticket is returned at
+        once and the caller must call ticket.start() before doing the work;
+        the running slot is only taken then, so time spent waiting for a job
+        executor thread doesn't count as in flight.
+        """
+        with self._cond:
+            self._check_quota(client_id)
+
+            if wait and self.in_flight < self.max_in_flight and self.queued == 0:
+                return self._admit_running()
+
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded("Server is at capacity", self._retry_after())
+
+            if not wait:
+                self.queued += 1
+                return Ticket(self, running=False)
+
+            self.queued += 1
+            deadline = time.time() + self.queue_timeout
+            while self.in_flight >= self.max_in_flight:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.queued -= 1
+                    self.rejected += 1
+                    self._cond.notify()
+                    raise Overloaded("Timed out waiting for capacity", self._retry_after())
+                self._cond.wait(remaining)
+            self.queued -= 1
+            return self._admit_running()
+
+    def check_quota(self, client_id):
+        """Charge one request to the client's quota or raise Overloaded
+
+        For work admitted elsewhere (e.g. the shared work queue) that still
+        counts against per-client quotas.
+        """
+        with self._cond:
+            self._check_quota(client_id)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "rejected": self.rejected,
+                "degraded": self.degraded,
+                "avg_duration": round(self._avg_duration, 2),
+            }
+
+    def _admit_running(self):
+        """Claim a running slot (caller holds the lock)"""
+        # Pressure is judged on the load before this request joins it
+        ticket = Ticket(self, running=True, degraded=self._under_pressure())
+        self.in_flight += 1
+        if ticket.degraded:
+            self.degraded += 1
+        return ticket
+
+    def _start(self, ticket):
+        with self._cond:
+            while self.in_flight >= self.max_in_flight:
+                self._cond.wait()
+            self.queued -= 1
+            ticket.degraded = self._under_pressure()
+            self.in_flight += 1
+            ticket.running = True
+            ticket.started_at = time.time()
+            if ticket.degraded:
+                self.degraded += 1
+
+    def _release(self, ticket):
+        with self._cond:
+            if ticket.running:
+                self.in_flight -= 1
+                # Exponentially weighted service time, used for Retry-After hints
+                duration = time.time() - ticket.started_at
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            else:
+                self.queued -= 1
+            self._cond.notify()
+
+    def _under_pressure(self):
+        load = (self.in_flight + self.queued) / max(self.max_in_flight, 1)
+        return load >= self.degrade_at
+
+    def _retry_after(self):
+        backlog = (self.queued + 1) / max(self.max_in_flight, 1)
+        return max(1, math.ceil(self._avg_duration * backlog))
+
+    def _check_quota(self, client_id):
+        if not self.client_quota or client_id is None:
+            return
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) > 10000:
+                # Drop clients whose buckets have fully refilled
+                now = time.time()
+                self._buckets = {
+                    k: b
+                    for k, b in self._buckets.items()
+                    if now - b.updated < 60
+                }
+            bucket = self._buckets[client_id] = _TokenBucket(self.client_quota)
+        wait = bucket.take()
+        if wait:
+            self.rejected += 1
+            raise Overloaded("Client quota exceeded", max(1, math.ceil(wait)))
@@ -0,0 +1,43 @@
+import os
+import re
+import hashlib
+import threading
+
+# Cache lifetime for fingerprinted static files; their URL changes with their content
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+_HASHED_RE = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<ext>\.[^./]+)$")
+_hashes = {}
+_lock = threading.Lock()
+
+
+def asset_hash(path):
+    """Short content hash of a file, recomputed only when its mtime or size changes"""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _hashes.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    with _lock:
+        _hashes[path] = (key, digest)
+    return digest
+
+
+def hashed_name(static_dir, filename):
+    """css/custom.css -> css/custom.<hash>.css; unknown files are returned unchanged"""
+    path = os.path.join(static_dir, filename)
+    if not os.path.isfile(path):
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{asset_hash(path)}{ext}"
+
+
+def split_hashed(filename):
+    """css/custom.<hash>.css -> ("css/custom.css", hash), or (filename, None)"""
+    match = _HASHED_RE.match(filename)
+    if not match:
+        return filename, None
+    return f"{match['stem']}{match['ext']}", match["digest"]
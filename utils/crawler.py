@@ -1,8 +1,11 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse, urljoin
 
+from utils.http import fetch
+from utils.deadline import timeout_for, note_failure
+from utils.socials.common import classify_url
+
 
 def extract_domain(url):
     """Extract domain name from URL"""
@@ -10,24 +13,34 @@ def extract_domain(url):
     return parsed_uri.netloc.lower()
 
 
-def extract_social_links(url):
+def normalize_url(url):
+    """Normalize a URL so equivalent spellings share one cache/coalescing key"""
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    port = parsed.port
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+
+    path = parsed.path.rstrip("/")
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{scheme}://{host}{path}{query}"
+
+
+def extract_social_links(url, deadline=None):
     """Extract social media links from website - simplified"""
     try:
-        platform_patterns = {
-            "facebook": r"facebook\.com|fb\.com",
-            "twitter": r"twitter\.com|x\.com",
-            "instagram": r"instagram\.com",
-            "linkedin": r"linkedin\.com",
-            "youtube": r"youtube\.com|youtu\.be",
-            "pinterest": r"pinterest\.com",
-            "tiktok": r"tiktok\.com",
-        }
-
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = fetch(
+            url, headers=headers, timeout=timeout_for(deadline, 10, "social_links")
+        )
         if response.status_code != 200:
             return []
 
@@ -45,21 +58,54 @@ def extract_social_links(url):
             if not href.startswith(("http://", "https://")):
                 href = urljoin(url, href)
 
-            # Check for social media platforms
-            for platform, pattern in platform_patterns.items():
-                if platform in found_platforms:
-                    continue
-
-                if re.search(pattern, href, re.IGNORECASE):
-                    social_links.append({"platform": platform, "url": href})
-                    found_platforms.add(platform)
+            # Classify with a single host lookup in the platform registry
+            match = classify_url(href)
+            if match and match.platform not in found_platforms:
+                social_links.append({"platform": match.platform, "url": href})
+                found_platforms.add(match.platform)
 
         return social_links
     except Exception:
+        note_failure(deadline, "social_links")
         return []
 
 
-def extract_website_content(url):
+def extract_visual_assets(soup, url, limit=10):
+    """Collect stylesheet and brand image URLs plus inline CSS from a parsed page"""
+    stylesheets = []
+    for link in soup.find_all("link", href=True):
+        rel = [r.lower() for r in (link.get("rel") or [])]
+        if "stylesheet" in rel and len(stylesheets) < limit:
+            stylesheets.append(urljoin(url, link["href"]))
+
+    images = []
+    og_image = soup.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        images.append(urljoin(url, og_image["content"]))
+    for img in soup.find_all("img", src=True):
+        attrs = " ".join(
+            [img.get("src", ""), img.get("alt", ""), " ".join(img.get("class") or [])]
+        )
+        if "logo" in attrs.lower():
+            images.append(urljoin(url, img["src"]))
+            break
+    for link in soup.find_all("link", href=True):
+        rel = " ".join(link.get("rel") or []).lower()
+        if "apple-touch-icon" in rel or rel == "icon":
+            images.append(urljoin(url, link["href"]))
+            break
+
+    inline_css = [style.get_text() for style in soup.find_all("style")]
+    inline_css += [tag["style"] for tag in soup.find_all(style=True)]
+
+    return {
+        "stylesheets": stylesheets,
+        "images": list(dict.fromkeys(images))[:limit],
+        "inline_css": "\n".join(inline_css)[:100000],
+    }
+
+
+def extract_website_content(url, deadline=None):
     """Extract basic website content"""
     try:
         domain = extract_domain(url)
@@ -69,7 +115,9 @@ def extract_website_content(url):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = fetch(
+            url, headers=headers, timeout=timeout_for(deadline, 10, "website_content")
+        )
         if response.status_code != 200:
             return {
                 "brand_name": default_name,
@@ -111,8 +159,10 @@ def extract_website_content(url):
             "brand_name": brand_name,
             "description": description,
             "content": content,
+            "assets": extract_visual_assets(soup, url),
         }
     except Exception:
+        note_failure(deadline, "website_content")
         domain = extract_domain(url)
         default_name = domain.replace("www.", "").split(".")[0].capitalize()
         return {
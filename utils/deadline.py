@@ -0,0 +1,66 @@
+import os
+import time
+import threading
+
+# Total time budget for one /analyze run (seconds)
+ANALYZE_BUDGET = float(os.environ.get("NARRATIX_ANALYZE_BUDGET", "25"))
+# Smallest timeout worth starting a network call with (seconds)
+MIN_STAGE_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage has too little budget left to start"""
+
+
+class Deadline:
+    """Request-scoped time budget shared by every stage of the pipeline"""
+
+    def __init__(self, budget=ANALYZE_BUDGET):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self._truncated = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def has_budget(self, seconds):
+        """True if at least `seconds` of the budget are left"""
+        return self.remaining() >= seconds
+
+    def timeout(self, default, stage=None, minimum=MIN_STAGE_TIMEOUT):
+        """Timeout for the next call: the default capped by the remaining budget
+
+        Raises DeadlineExceeded (and marks the stage as cut short) when less
+        than `minimum` seconds remain.
+        """
+        remaining = self.remaining()
+        if remaining < minimum:
+            if stage:
+                self.mark_truncated(stage)
+            raise DeadlineExceeded(f"No time left for {stage or 'stage'}")
+        return remaining if default is None else min(default, remaining)
+
+    def mark_truncated(self, stage):
+        """Record that a stage was skipped or cut short by the deadline"""
+        with self._lock:
+            if stage not in self._truncated:
+                self._truncated.append(stage)
+
+    @property
+    def truncated(self):
+        with self._lock:
+            return list(self._truncated)
+
+
+def timeout_for(deadline, default, stage=None):
+    """Timeout for a call that may or may not run under a deadline"""
+    if deadline is None:
+        return default
+    return deadline.timeout(default, stage)
+
+
+def note_failure(deadline, stage):
+    """Mark a failed stage as cut short if the failure was due to the budget running out"""
+    if deadline is not None and not deadline.has_budget(MIN_STAGE_TIMEOUT):
+        deadline.mark_truncated(stage)
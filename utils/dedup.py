@@ -0,0 +1,129 @@
+import os
+import re
+import copy
+import json
+import time
+import hashlib
+
+from utils.storage import get_connection, get_lock
+from utils.sketches import build_sketch, NUM_PERM
+
+# Banding of the MinHash signature: 16 bands x 4 rows catches pairs above ~0.6 Jaccard
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+# Estimated Jaccard similarity above which a stored analysis is reused
+DEDUP_THRESHOLD = float(os.environ.get("NARRATIX_DEDUP_THRESHOLD", "0.85"))
+# Pages with less text than this are too generic to match reliably
+MIN_CONTENT_WORDS = 50
+
+_DB_NAME = "near_duplicates.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lsh_docs (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    brand_name TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    result TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    doc_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket);
+"""
+
+
+def _db():
+    return get_connection(_DB_NAME, _SCHEMA)
+
+
+def _band_keys(signature):
+    """One bucket key per band of the MinHash signature"""
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS : (band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(
+            ",".join(map(str, rows)).encode("ascii"), digest_size=8
+        ).hexdigest()
+        yield band, digest
+
+
+def content_sketch(website_content):
+    """Sketch of the extracted page text, or None if the page is too thin to match"""
+    sketch = build_sketch(website_content.get("content", ""))
+    if not sketch or sketch["words"] < MIN_CONTENT_WORDS:
+        return None
+    return sketch
+
+
+def find_near_duplicate(sketch, exclude_url=None, threshold=None):
+    """Best stored analysis whose page is a near-duplicate of the sketch
+
+    Candidates come from LSH bucket collisions, so the lookup cost depends on
+    the number of colliding documents rather than the size of the index.
+    Returns (url, similarity, brand_name, result) or None.
+    """
+    if not sketch:
+        return None
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    signature = sketch["minhash"]
+
+    clauses = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * LSH_BANDS)
+    params = [value for pair in _band_keys(signature) for value in pair]
+    with get_lock(_DB_NAME):
+        rows = _db().execute(
+            f"""SELECT DISTINCT d.url, d.brand_name, d.signature, d.result
+            FROM lsh_buckets b JOIN lsh_docs d ON d.doc_id = b.doc_id
+            WHERE {clauses}""",
+            params,
+        ).fetchall()
+
+    best = None
+    for row in rows:
+        if row["url"] == exclude_url:
+            continue
+        candidate = json.loads(row["signature"])
+        estimate = sum(a == b for a, b in zip(signature, candidate)) / len(signature)
+        if estimate >= threshold and (best is None or estimate > best[1]):
+            best = (row["url"], estimate, row["brand_name"], row["result"])
+
+    if best is None:
+        return None
+    url, estimate, brand_name, result = best
+    return url, round(estimate, 3), brand_name, json.loads(result)
+
+
+def index_result(url, sketch, brand_name, result):
+    """Add or replace a page's analysis in the persistent LSH index"""
+    if not sketch:
+        return
+    with get_lock(_DB_NAME):
+        db = _db()
+        existing = db.execute("SELECT doc_id FROM lsh_docs WHERE url = ?", (url,)).fetchone()
+        if existing:
+            db.execute("DELETE FROM lsh_buckets WHERE doc_id = ?", (existing["doc_id"],))
+            db.execute("DELETE FROM lsh_docs WHERE doc_id = ?", (existing["doc_id"],))
+        cursor = db.execute(
+            "INSERT INTO lsh_docs (url, brand_name, signature, result, indexed_at) VALUES (?, ?, ?, ?, ?)",
+            (url, brand_name, json.dumps(sketch["minhash"]), json.dumps(result), time.time()),
+        )
+        db.executemany(
+            "INSERT INTO lsh_buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+            [(band, bucket, cursor.lastrowid) for band, bucket in _band_keys(sketch["minhash"])],
+        )
+
+
+def derive_result(result, source_brand, website_content):
+    """Adapt a near-duplicate's analysis to the page being analyzed"""
+    derived = copy.deepcopy(result)
+    brand_name = website_content.get("brand_name") or source_brand
+    if source_brand and brand_name != source_brand:
+        # Whole-word matches only, so "Go" is not replaced inside "Google"
+        pattern = re.compile(rf"(?<!\w){re.escape(source_brand)}(?!\w)")
+        derived["brand_story"] = pattern.sub(brand_name, derived.get("brand_story", ""))
+    derived["brand_name"] = brand_name
+    derived["brand_description"] = website_content.get(
+        "description", derived.get("brand_description", "")
+    )
+    return derived
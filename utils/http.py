@@ -0,0 +1,62 @@
+import time
+
+import requests
+
+from utils.singleflight import SingleFlight
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
+}
+
+_fetch_flight = SingleFlight("http")
+_bounded_flight = SingleFlight("http-bounded")
+
+
+def fetch(url, headers=None, timeout=10):
+    """GET a URL, sharing the response with concurrent requests for the same URL"""
+    if headers is None:
+        headers = DEFAULT_HEADERS
+    key = (url, tuple(sorted(headers.items())))
+    # Waiters give up after their own timeout, not whatever the leader was given
+    return _fetch_flight.do(
+        key, requests.get, url, headers=headers, timeout=timeout, wait_timeout=timeout
+    )
+
+
+def _get_bounded(url, max_bytes, headers, timeout):
+    # The socket timeout only bounds each read; this bounds the whole download
+    cutoff = time.monotonic() + timeout
+    with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            return None
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            return None
+        body = bytearray()
+        while True:
+            # read1 returns whatever has arrived, so a slow server can't block past the cutoff
+            chunk = response.raw.read1(64 * 1024, decode_content=True)
+            if not chunk:
+                break
+            body.extend(chunk)
+            if len(body) > max_bytes:
+                return None  # Stop reading as soon as the cap is passed
+            if time.monotonic() > cutoff:
+                return None  # A server trickling bytes must not outlast the budget
+        return bytes(body)
+
+
+def fetch_bounded(url, max_bytes, headers=None, timeout=10):
+    """GET a URL's body, or None if it isn't a 200, is larger than max_bytes or
+    takes longer than timeout seconds in total
+
+    The body is streamed, so at most max_bytes (plus one chunk) is ever held.
+    Pass a deadline-derived timeout (see utils.deadline.timeout_for) to keep
+    the download inside a request budget.
+    """
+    if headers is None:
+        headers = DEFAULT_HEADERS
+    key = (url, max_bytes, tuple(sorted(headers.items())))
+    return _bounded_flight.do(
+        key, _get_bounded, url, max_bytes, headers, timeout, wait_timeout=timeout
+    )
@@ -0,0 +1,104 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of analyses the in-process executor runs at the same time
+JOB_WORKERS = int(os.environ.get("NARRATIX_JOB_WORKERS", "4"))
+# How long finished jobs stay available for polling (seconds)
+JOB_TTL = int(os.environ.get("NARRATIX_JOB_TTL", "3600"))
+
+
+class Job:
+    """State of a single asynchronous analysis"""
+
+    def __init__(self, url):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "url": self.url,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "error":
+            data["error"] = self.error
+        return data
+
+
+class JobManager:
+    """Runs analyses on a bounded thread pool and tracks their state for polling"""
+
+    def __init__(self, max_workers=JOB_WORKERS, ttl=JOB_TTL):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="narratix-job"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.ttl = ttl
+
+    def submit(self, url, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) as a job for url and return the job immediately"""
+        job = Job(url)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Return the job once it finishes or the timeout elapses (long-poll)"""
+        job = self.get(job_id)
+        if job and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def stats(self):
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "error": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.max_workers, **counts}
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "error"
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    def _prune(self):
+        """Forget finished jobs older than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -1,6 +1,25 @@
 import json
-from utils.llm_providers.gemini import generate_with_gemini
-from utils.llm_providers.groq import generate_with_groq
+import time
+import hashlib
+from functools import partial
+from utils.singleflight import SingleFlight, FlightTimeout
+from utils.deadline import DeadlineExceeded, timeout_for, note_failure
+from utils.llm_providers.gemini import generate_with_gemini, GEMINI_MODELS
+from utils.llm_providers.groq import generate_with_groq, GROQ_MODEL
+from utils.llm_providers.router import LatencyRouter
+
+_llm_flight = SingleFlight("llm")
+
+# Every provider/model pair is routed on its own observed latency and success rate
+ROUTER = LatencyRouter(
+    [(f"gemini:{model}", partial(generate_with_gemini, model_name=model)) for model in GEMINI_MODELS]
+    + [(f"groq:{GROQ_MODEL}", generate_with_groq)]
+)
+
+# Remaining budget below which the LLM is skipped in favour of the template (seconds)
+LLM_MIN_BUDGET = 5.0
+# Upper bound for a single provider call (seconds)
+LLM_TIMEOUT = 60
 
 
 def create_brand_story_prompt(brand_name, description, analysis, social_content):
@@ -53,31 +72,75 @@ def create_brand_story_prompt(brand_name, description, analysis, social_content)
     """
 
 
-def generate_with_llm(brand_name, description, analysis, social_content):
+def generate_with_llm(brand_name, description, analysis, social_content, deadline=None):
     """Try to generate content with available LLMs"""
     prompt = create_brand_story_prompt(
         brand_name, description, analysis, social_content
     )
 
-    # Try providers in sequence
-    for generator in [generate_with_gemini, generate_with_groq]:
+    # Identical prompts in flight at the same time are generated once
+    prompt_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    try:
+        # A shared call may run under a longer budget (e.g. a tracking refresh),
+        # so only wait as long as this request's own deadline allows
+        return _llm_flight.do(
+            prompt_key,
+            _generate_from_prompt,
+            prompt,
+            deadline,
+            wait_timeout=deadline.remaining() if deadline else None,
+        )
+    except FlightTimeout:
+        note_failure(deadline, "brand_story")
+        return None
+
+
+def _generate_from_prompt(prompt, deadline=None, max_tokens=None):
+    """Try provider/model options in the router's order for a prepared prompt"""
+    for name, generator in ROUTER.order():
         try:
-            content = generator(prompt)
+            timeout = timeout_for(deadline, LLM_TIMEOUT, "brand_story")
+        except DeadlineExceeded:
+            break
+
+        options = {"max_tokens": max_tokens} if max_tokens else {}
+        started = time.monotonic()
+        try:
+            content = generator(prompt, timeout=timeout, **options)
+            ROUTER.record(name, time.monotonic() - started, bool(content))
             if content:
                 return content
         except Exception:
+            ROUTER.record(name, time.monotonic() - started, False)
             continue
 
+    note_failure(deadline, "brand_story")
     return None
 
 
-def generate_brand_story(brand_name, description, analysis, social_content):
+def generate_brand_story(
+    brand_name, description, analysis, social_content, use_llm=True, deadline=None
+):
     """Generate brand story or fall back to simplified version"""
-    content = generate_with_llm(brand_name, description, analysis, social_content)
+    if use_llm and deadline and not deadline.has_budget(LLM_MIN_BUDGET):
+        # Not enough budget left for a model call, use the template instead
+        deadline.mark_truncated("brand_story")
+        use_llm = False
+
+    content = (
+        generate_with_llm(
+            brand_name, description, analysis, social_content, deadline
+        )
+        if use_llm
+        else None
+    )
     if content:
         return content
+    return template_brand_story(brand_name, description, analysis, social_content)
+
 
-    # Fallback to simplified generator
+def template_brand_story(brand_name, description, analysis, social_content):
+    """Simplified brand story used when no model output is available"""
     keywords = analysis.get("keywords", [])[:3]
     key_values = analysis.get("key_values", [])[:3] or ["Quality"]
     tone = analysis.get("tone_analysis", {})
@@ -0,0 +1,124 @@
+import re
+
+from utils.llm_providers import (
+    create_brand_story_prompt,
+    template_brand_story,
+    _generate_from_prompt,
+)
+
+# Brands packed into one provider request
+BATCH_SIZE = 4
+# Output token allowance per brand in a packed request
+TOKENS_PER_STORY = 2048
+
+_SECTION_RE = re.compile(
+    r"<<<BRAND (\d+)>>>\s*(.*?)\s*<<<END BRAND \1>>>", re.DOTALL
+)
+REQUIRED_SECTIONS = ["core values", "voice", "social media", "conclusion"]
+
+
+def create_batch_prompt(prompts):
+    """Pack several brand story prompts into one request with numbered delimiters"""
+    parts = [
+        f"Write {len(prompts)} separate brand stories, one per brand below.",
+        "Wrap each story exactly like this, with nothing outside the markers:",
+        "<<<BRAND n>>>",
+        "(markdown story for brand n)",
+        "<<<END BRAND n>>>",
+        "",
+    ]
+    for index, prompt in enumerate(prompts, start=1):
+        parts.append(f"=== Brand {index} ===")
+        parts.append(prompt.strip())
+        parts.append("")
+    return "\n".join(parts)
+
+
+def split_batch_response(text, count):
+    """Map brand number (1-based) to its story text from a packed response"""
+    stories = {}
+    for match in _SECTION_RE.finditer(text or ""):
+        index = int(match.group(1))
+        if 1 <= index <= count and index not in stories:
+            stories[index] = match.group(2).strip()
+    return stories
+
+
+def is_valid_story(story, brand_name):
+    """Check a story has the title line and the requested sections"""
+    if not story:
+        return False
+    lines = story.splitlines()
+    if not any(
+        line.lstrip().startswith("#") and brand_name.lower() in line.lower()
+        for line in lines
+    ):
+        return False
+    headings = " ".join(line.lower() for line in lines if line.lstrip().startswith("#"))
+    return all(section in headings for section in REQUIRED_SECTIONS)
+
+
+def generate_brand_stories(items, generator=None, batch_size=BATCH_SIZE, deadline=None):
+    """Generate stories for many brands with packed provider requests
+
+    items are dicts with brand_name, description, analysis and social_content.
+    generator(prompt, max_tokens=None) -> text defaults to the configured providers and can be
+    replaced with a local fake. Stories that are missing from the packed
+    response or fail validation are generated with a single-brand request,
+    and brands whose single request also fails get the template story.
+    Returns (stories, fallback) in the order of items, where fallback[i]
+    is True if story i is the template.
+    """
+    if generator is None:
+
+        def generator(prompt, max_tokens=None):
+            return _generate_from_prompt(prompt, deadline, max_tokens)
+
+    prompts = [
+        create_brand_story_prompt(
+            item["brand_name"],
+            item.get("description", ""),
+            item.get("analysis", {}),
+            item.get("social_content", []),
+        )
+        for item in items
+    ]
+
+    stories = [None] * len(items)
+    fallback = [False] * len(items)
+    for start in range(0, len(items), batch_size):
+        chunk = list(range(start, min(start + batch_size, len(items))))
+        if len(chunk) == 1:
+            continue  # Nothing to pack; the single-brand path below handles it
+        try:
+            response = generator(
+                create_batch_prompt([prompts[i] for i in chunk]),
+                max_tokens=TOKENS_PER_STORY * len(chunk),
+            )
+        except Exception:
+            response = None
+        parsed = split_batch_response(response, len(chunk))
+        for offset, index in enumerate(chunk, start=1):
+            story = parsed.get(offset)
+            if is_valid_story(story, items[index]["brand_name"]):
+                stories[index] = story
+
+    for index, item in enumerate(items):
+        if stories[index]:
+            continue
+        # Per-brand retry, then the template
+        try:
+            story = generator(prompts[index], max_tokens=TOKENS_PER_STORY)
+        except Exception:
+            story = None
+        if not story:
+            story = template_brand_story(
+                item["brand_name"],
+                item.get("description", ""),
+                item.get("analysis", {}),
+                item.get("social_content", []),
+            )
+            fallback[index] = True
+        stories[index] = story
+
+    return stories, fallback
@@ -8,18 +8,30 @@ if not GEMINI_API_KEY:
 
 genai.configure(api_key=GEMINI_API_KEY)
 
+GEMINI_MODELS = [
+    "gemini-2.5-pro-exp-03-25",
+    "models/gemini-2.5-pro-exp-03-25",
+    "gemini-pro",
+]
 
-def generate_with_gemini(prompt):
-    """Generate content using Google's Gemini AI model"""
-    model_options = [
-        "gemini-2.5-pro-exp-03-25",
-        "models/gemini-2.5-pro-exp-03-25",
-        "gemini-pro",
-    ]
+
+def generate_with_gemini(prompt, timeout=None, max_tokens=None, model_name=None):
+    """Generate content using Google's Gemini AI model
+
+    With model_name only that model is tried; otherwise GEMINI_MODELS in order.
+    """
+    model_options = [model_name] if model_name else GEMINI_MODELS
+
+    request_options = {"timeout": timeout} if timeout else None
+    generation_config = {"max_output_tokens": max_tokens} if max_tokens else None
 
     for model_name in model_options:
         try:
-            response = genai.GenerativeModel(model_name).generate_content(prompt)
+            response = genai.GenerativeModel(model_name).generate_content(
+                prompt,
+                generation_config=generation_config,
+                request_options=request_options,
+            )
             if response and hasattr(response, "text"):
                 return response.text
         except Exception:
@@ -8,8 +8,10 @@ if not GROQ_API_KEY:
 
 groq_client = Groq(api_key=GROQ_API_KEY)
 
+GROQ_MODEL = "llama-3.3-70b-versatile"
 
-def generate_with_groq(prompt):
+
+def generate_with_groq(prompt, timeout=None, max_tokens=2048):
     """Generate content using Groq API"""
     try:
         completion = groq_client.chat.completions.create(
@@ -20,10 +22,11 @@ def generate_with_groq(prompt):
                 },
                 {"role": "user", "content": prompt},
             ],
-            model="llama-3.3-70b-versatile",
+            model=GROQ_MODEL,
             temperature=0.5,
-            max_completion_tokens=2048,
+            max_completion_tokens=max_tokens,
             top_p=1,
+            timeout=timeout,
         )
         return completion.choices[0].message.content
     except Exception:
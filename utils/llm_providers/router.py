@@ -0,0 +1,77 @@
+import os
+import random
+import threading
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.2
+# Share of requests sent to a non-best option to keep its statistics fresh
+EXPLORATION_RATE = float(os.environ.get("NARRATIX_LLM_EXPLORATION", "0.1"))
+# Assumed latency of an option that has not succeeded yet (seconds)
+PRIOR_LATENCY = 5.0
+# Keeps the expected time finite for an option that has only ever failed
+MIN_SUCCESS_RATE = 1e-6
+
+
+class LatencyRouter:
+    """Orders LLM options by expected time to a successful completion
+
+    Each option keeps an exponentially weighted latency of its successful
+    calls and an exponentially weighted success rate. The expected
+    completion time is latency / success rate, so an option that fails
+    quickly is still charged for every failure and sinks in the ranking.
+    Options are tried best first, except that a small exploration share of
+    requests leads with another option.
+    """
+
+    def __init__(self, options, alpha=EWMA_ALPHA, exploration=EXPLORATION_RATE, rng=None):
+        self._options = list(options)
+        self._stats = {
+            name: {"latency": PRIOR_LATENCY, "success": 1.0, "calls": 0, "failures": 0}
+            for name, _ in self._options
+        }
+        self.alpha = alpha
+        self.exploration = exploration
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    def _expected_time(self, name):
+        stats = self._stats[name]
+        return stats["latency"] / max(stats["success"], MIN_SUCCESS_RATE)
+
+    def order(self):
+        """Options to try for the next request, as (name, generator) pairs"""
+        with self._lock:
+            ranked = sorted(self._options, key=lambda option: self._expected_time(option[0]))
+            if len(ranked) > 1 and self._rng.random() < self.exploration:
+                explored = ranked.pop(self._rng.randrange(1, len(ranked)))
+                ranked.insert(0, explored)
+        return ranked
+
+    def record(self, name, latency, success):
+        """Fold one observed call into the option's moving averages"""
+        with self._lock:
+            stats = self._stats[name]
+            stats["calls"] += 1
+            if not success:
+                stats["failures"] += 1
+            if success:
+                # Fast failures must not make an option look fast
+                stats["latency"] += self.alpha * (latency - stats["latency"])
+            stats["success"] += self.alpha * ((1.0 if success else 0.0) - stats["success"])
+
+    def snapshot(self):
+        """Current routing table, best option first"""
+        with self._lock:
+            rows = [
+                {
+                    "option": name,
+                    "latency": round(stats["latency"], 3),
+                    "success_rate": round(stats["success"], 3),
+                    "expected_time": round(self._expected_time(name), 3),
+                    "calls": stats["calls"],
+                    "failures": stats["failures"],
+                }
+                for name, stats in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row["expected_time"])
+        return {"exploration_rate": self.exploration, "options": rows}
@@ -0,0 +1,143 @@
+from utils.crawler import extract_website_content, extract_social_links, normalize_url
+from utils.socials import extract_social_content
+from utils.analyzer import analyze_content
+from utils.llm_providers import generate_brand_story
+from utils.visuals import generate_visual_profile, generate_consistency_score
+from utils.singleflight import SingleFlight
+from utils.deadline import Deadline, ANALYZE_BUDGET
+from utils.dedup import content_sketch, find_near_duplicate, index_result, derive_result
+from utils.resultstore import record_result
+from utils.reports import save_report
+
+_analysis_flight = SingleFlight("analyze")
+# Slack on top of the analysis budget before a coalesced caller stops waiting (seconds)
+COALESCED_WAIT_GRACE = 5.0
+
+
+def analyze_url(url, degraded=False):
+    """Analyze a website, sharing one run between concurrent requests for the same URL"""
+    url = normalize_url(url)
+    # Degraded runs produce a different result, so they are shared only with each other
+    return _analysis_flight.do(
+        (url, degraded),
+        run_analysis,
+        url,
+        degraded,
+        wait_timeout=ANALYZE_BUDGET + COALESCED_WAIT_GRACE,
+    )
+
+
+def run_analysis(url, degraded=False):
+    """Run the full Extract → Analyze → Generate workflow for a URL
+
+    In degraded mode the LLM stage is skipped and the template story is used.
+    Every stage draws its timeouts from one request-wide deadline; stages
+    that were skipped or cut short are listed under "truncated".
+
+    If the page is a near-duplicate of one analyzed before (mirror, redirect,
+    shared template), its story and visual profile are reused and the result
+    is marked with "derived_from"; social data, keywords and the consistency
+    score are always this page's own.
+    """
+    deadline = Deadline()
+    website_content = extract_website_content(url, deadline)
+
+    sketch = content_sketch(website_content)
+    duplicate = find_near_duplicate(sketch, exclude_url=url)
+
+    # Socials and the analyzer are cheap (profiles are cached), and are always
+    # this page's own, even when the rest is borrowed from a near-duplicate
+    social_links = extract_social_links(url, deadline)
+    social_content = extract_social_content(social_links, deadline)
+    analysis = analyze_content(website_content, social_content)
+
+    if duplicate:
+        source_url, score, source_brand, source_result = duplicate
+        result = derive_result(source_result, source_brand, website_content)
+        result["social_links"] = social_links
+        result["social_analytics"] = social_analytics(social_content)
+        result["keywords"] = analysis.get("keywords", [])
+        result["key_values"] = analysis.get("key_values", [])
+        result["consistency_score"] = generate_consistency_score(
+            website_content, social_content, analysis, url
+        )
+        result["derived_from"] = {"url": source_url, "similarity": score}
+        result["degraded"] = degraded
+        result["truncated"] = deadline.truncated
+        record_result(url, result, analysis)
+        result["report_id"] = save_report(url, result)
+        return result
+
+    # Generate outputs
+    brand_name = website_content.get("brand_name", "Brand")
+    brand_story = generate_brand_story(
+        brand_name,
+        website_content.get("description", ""),
+        analysis,
+        social_content,
+        use_llm=not degraded,
+        deadline=deadline,
+    )
+    visual_profile = generate_visual_profile(analysis, website_content, deadline)
+    consistency_score = generate_consistency_score(
+        website_content, social_content, analysis, url
+    )
+
+    result = assemble_result(
+        website_content,
+        social_links,
+        social_content,
+        analysis,
+        brand_story,
+        visual_profile,
+        consistency_score,
+    )
+    result["degraded"] = degraded
+    result["truncated"] = deadline.truncated
+
+    # Only complete analyses are offered for reuse by near-duplicate pages
+    if not degraded and not result["truncated"]:
+        index_result(url, sketch, brand_name, result)
+    record_result(url, result, analysis)
+    result["report_id"] = save_report(url, result)
+    return result
+
+
+def social_analytics(social_content):
+    """Per-platform summary shown in the /analyze response"""
+    return [
+        {
+            "platform": s["platform"],
+            "followers": s.get("followers", "N/A"),
+            "engagement": s.get("engagement", "Medium"),
+            "growth": s.get("growth"),
+        }
+        for s in social_content
+    ]
+
+
+def assemble_result(
+    website_content,
+    social_links,
+    social_content,
+    analysis,
+    brand_story,
+    visual_profile,
+    consistency_score,
+):
+    """Shape stage outputs into the /analyze response"""
+    return {
+        "brand_name": website_content.get("brand_name", "Brand"),
+        "brand_description": website_content.get("description", ""),
+        "social_links": social_links,
+        "social_analytics": social_analytics(social_content),
+        "keywords": analysis.get("keywords", []),
+        "key_values": analysis.get("key_values", []),
+        "brand_story": brand_story,
+        "visual_profile": visual_profile,
+        "consistency_score": consistency_score,
+        "degraded": False,
+        "truncated": [],
+        "derived_from": None,
+        "report_id": None,
+    }
@@ -0,0 +1,126 @@
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from utils.socials.store import parse_follower_count
+
+# Platforms with their own follower column in the result store
+TRACKED_PLATFORMS = ("instagram", "facebook", "twitter", "youtube")
+
+
+@dataclass(slots=True)
+class SocialProfile:
+    """One platform's profile data, as produced by the socials extractors"""
+
+    platform: str
+    username: str = ""
+    followers: str = "N/A"
+    follower_count: Optional[int] = None
+    engagement: str = "Medium"
+    frequency: str = ""
+    bio: str = ""
+    url: str = ""
+    type: str = "profile"
+    real_data: bool = False
+
+    @classmethod
+    def from_dict(cls, data):
+        followers = data.get("followers", "N/A")
+        return cls(
+            platform=data.get("platform", ""),
+            username=data.get("username", "") or "",
+            followers=str(followers),
+            follower_count=parse_follower_count(followers),
+            engagement=data.get("engagement", "Medium"),
+            frequency=data.get("frequency", ""),
+            bio=data.get("bio", "") or "",
+            url=data.get("url", ""),
+            type=data.get("type", "profile"),
+            real_data=bool(data.get("real_data", False)),
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class Analysis:
+    """Analyzer output with the sentiment and tone scores flattened out"""
+
+    keywords: tuple = ()
+    key_values: tuple = ()
+    tone: dict = field(default_factory=dict)
+    polarity: float = 0.0
+    subjectivity: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data):
+        sentiment = data.get("sentiment", {})
+        return cls(
+            keywords=tuple(data.get("keywords", [])),
+            key_values=tuple(data.get("key_values", [])),
+            tone=dict(data.get("tone_analysis", {})),
+            polarity=float(sentiment.get("polarity", 0.0)),
+            subjectivity=float(sentiment.get("subjectivity", 0.0)),
+        )
+
+    def to_dict(self):
+        """The analyzer's original dict shape"""
+        return {
+            "keywords": list(self.keywords),
+            "key_values": list(self.key_values),
+            "tone_analysis": dict(self.tone),
+            "sentiment": {"polarity": self.polarity, "subjectivity": self.subjectivity},
+        }
+
+
+@dataclass(slots=True)
+class BrandRecord:
+    """One analyzed brand as a flat row of the result store"""
+
+    url: str
+    brand_name: str
+    analyzed_at: float
+    followers_total: int = -1
+    instagram_followers: int = -1
+    facebook_followers: int = -1
+    twitter_followers: int = -1
+    youtube_followers: int = -1
+    polarity: float = 0.0
+    subjectivity: float = 0.0
+    consistency_score: float = 0.0
+    keywords: str = ""
+    brand_story: str = ""
+
+    @classmethod
+    def from_result(cls, url, result, analysis, analyzed_at):
+        """Build a row from a pipeline result and its analyzer output
+
+        Unknown follower counts are stored as -1.
+        """
+        analysis = analysis if isinstance(analysis, Analysis) else Analysis.from_dict(analysis or {})
+        counts = {
+            profile.platform.lower(): profile.follower_count
+            for profile in profiles_from_content(result.get("social_analytics", []))
+            if profile.follower_count is not None
+            and profile.platform.lower() in TRACKED_PLATFORMS
+        }
+        return cls(
+            url=url,
+            brand_name=result.get("brand_name", ""),
+            analyzed_at=analyzed_at,
+            followers_total=sum(counts.values()) if counts else -1,
+            instagram_followers=counts.get("instagram", -1),
+            facebook_followers=counts.get("facebook", -1),
+            twitter_followers=counts.get("twitter", -1),
+            youtube_followers=counts.get("youtube", -1),
+            polarity=analysis.polarity,
+            subjectivity=analysis.subjectivity,
+            consistency_score=float(result.get("consistency_score") or 0),
+            keywords=",".join(result.get("keywords", [])),
+            brand_story=result.get("brand_story") or "",
+        )
+
+
+def profiles_from_content(social_content):
+    """Convert socials extractor output (or a result's social_analytics) to SocialProfile records"""
+    return [SocialProfile.from_dict(entry) for entry in social_content if entry]
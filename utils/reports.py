@@ -0,0 +1,114 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+from functools import lru_cache
+
+try:
+    import brotli
+except ImportError:  # Optional; without it reports are served gzip-compressed
+    brotli = None
+
+from utils.storage import get_connection, get_lock
+
+# Encodings we can produce, most preferred first
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+# Report parts that can be served, and the column holding each
+PARTS = {"json": "body", "story": "story"}
+
+
+def _reports_db():
+    """Path of the reports database
+
+    With a shared work queue, reports live next to it so that reports saved
+    by workers on other hosts can be served by every web node.
+    """
+    if os.environ.get("NARRATIX_REPORTS_PATH"):
+        return os.path.abspath(os.environ["NARRATIX_REPORTS_PATH"])
+    if os.environ.get("NARRATIX_QUEUE_PATH"):
+        queue_dir = os.path.dirname(os.path.abspath(os.environ["NARRATIX_QUEUE_PATH"]))
+        return os.path.join(queue_dir, "reports.db")
+    return "reports.db"
+
+
+_DB_NAME = _reports_db()
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    story BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def _db():
+    return get_connection(_DB_NAME, _SCHEMA)
+
+
+def _canonical(result):
+    result = {k: v for k, v in result.items() if k != "report_id"}
+    return json.dumps(result, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def save_report(url, result):
+    """Store a result as an immutable report and return its id
+
+    The id is a hash of the result, so an identical result maps to the same report.
+    """
+    body = _canonical(result)
+    rid = hashlib.sha256(body).hexdigest()[:32]
+    story = (result.get("brand_story") or "").encode("utf-8")
+    with get_lock(_DB_NAME):
+        _db().execute(
+            "INSERT OR IGNORE INTO reports (id, url, body, story, created_at) VALUES (?, ?, ?, ?, ?)",
+            (rid, url, body, story, time.time()),
+        )
+    return rid
+
+
+def get_representation(rid, part, encoding="identity"):
+    """Bytes of a report part ("json" or "story") compressed with encoding, or None"""
+    try:
+        return _encoded(rid, part, encoding)
+    except KeyError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _encoded(rid, part, encoding):
+    # Reports never change, so encoded bodies can be cached; misses raise and are not cached
+    if encoding != "identity":
+        return compress(_encoded(rid, part, "identity"), encoding)
+    with get_lock(_DB_NAME):
+        row = _db().execute(
+            f"SELECT {PARTS[part]} FROM reports WHERE id = ?", (rid,)
+        ).fetchone()
+    if row is None:
+        raise KeyError(rid)
+    return bytes(row[0])
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=9)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return data
+
+
+def choose_encoding(accept_encodings, size):
+    """Best encoding the client accepts, or "identity" for small bodies or no match
+
+    accept_encodings is the request's parsed Accept-Encoding header.
+    """
+    if size < MIN_COMPRESS_SIZE:
+        return "identity"
+    for encoding in ENCODINGS:
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return "identity"
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import fields
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; writers are then only serialized within a process
+    fcntl = None
+
+from utils.storage import data_path, get_lock
+from utils.records import BrandRecord
+
+_DTYPES = {int: "<i8", float: "<f8", bool: "|b1"}
+_MANIFEST = "manifest.json"
+
+
+class StringColumn:
+    """Memory-mapped string column; values are decoded only when accessed"""
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets  # End offset of each row in data
+        self._data = data
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row out of range")
+        start = int(self._offsets[index - 1]) if index else 0
+        return bytes(self._data[start : int(self._offsets[index])]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def lengths(self):
+        """Byte length of every value, without decoding any of them"""
+        return np.diff(self._offsets, prepend=0)
+
+
+class ResultStore:
+    """Append-only columnar store of flat records in a directory of memory-mapped files
+
+    Every field of the record type is a column. Numeric columns are raw
+    little-endian arrays; string columns are an offsets array plus a UTF-8
+    data file. The manifest holds the committed row count and is replaced
+    atomically after each append, so readers can scan while a writer is
+    appending and never see a partial row.
+    """
+
+    def __init__(self, path=None, record_type=BrandRecord):
+        self.path = path or os.environ.get("NARRATIX_RESULTS_PATH") or data_path("results")
+        os.makedirs(self.path, exist_ok=True)
+        self.record_type = record_type
+        self.schema = {
+            f.name: "str" if f.type is str else _DTYPES[f.type] for f in fields(record_type)
+        }
+        self._lock = get_lock(f"resultstore:{os.path.abspath(self.path)}")
+
+        with self._lock, self._file_lock():
+            manifest = self._read_manifest()
+            if manifest is None:
+                self._write_manifest(0)
+            elif manifest["schema"] != self.schema:
+                raise ValueError(f"Result store at {self.path} has a different schema")
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_manifest(self):
+        try:
+            with open(self._file(_MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, rows):
+        tmp = self._file(f"{_MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"schema": self.schema, "rows": rows, "updated_at": time.time()}, f)
+        os.replace(tmp, self._file(_MANIFEST))
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize writers across processes sharing the directory"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._file("lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _append_bytes(self, filename, committed, payload):
+        with open(self._file(filename), "ab") as f:
+            f.truncate(committed)  # Drop anything left by a writer that died mid-append
+            f.write(payload)
+
+    def _string_end(self, name, rows):
+        """Committed size of a string column's data file"""
+        if rows == 0:
+            return 0
+        return int(self._map(f"{name}.offsets", "<i8", rows)[rows - 1])
+
+    def _map(self, filename, dtype, count):
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._file(filename), dtype=dtype, mode="r", shape=(count,))
+
+    def append(self, records):
+        """Append records (instances of the record type or dicts); returns the new row count"""
+        records = [
+            r if isinstance(r, self.record_type) else self.record_type(**r) for r in records
+        ]
+        with self._lock, self._file_lock():
+            rows = self._read_manifest()["rows"]
+            if not records:
+                return rows
+            for name, dtype in self.schema.items():
+                values = [getattr(r, name) for r in records]
+                if dtype == "str":
+                    encoded = [value.encode("utf-8") for value in values]
+                    end = self._string_end(name, rows)
+                    offsets = end + np.cumsum([len(value) for value in encoded], dtype="<i8")
+                    self._append_bytes(f"{name}.data", end, b"".join(encoded))
+                    self._append_bytes(f"{name}.offsets", rows * 8, offsets.tobytes())
+                else:
+                    array = np.asarray(values, dtype=dtype)
+                    self._append_bytes(f"{name}.col", rows * array.itemsize, array.tobytes())
+            self._write_manifest(rows + len(records))
+            return rows + len(records)
+
+    def __len__(self):
+        return self._read_manifest()["rows"]
+
+    def column(self, name, rows=None):
+        """One column as a read-only memmap (numeric) or a StringColumn"""
+        dtype = self.schema[name]
+        rows = len(self) if rows is None else rows
+        if dtype == "str":
+            end = self._string_end(name, rows)
+            return StringColumn(
+                self._map(f"{name}.offsets", "<i8", rows), self._map(f"{name}.data", "u1", end)
+            )
+        return self._map(f"{name}.col", dtype, rows)
+
+    def read(self, columns=None):
+        """Map column name to column for the requested columns (all by default)
+
+        All columns are cut at the same committed row count, so they stay
+        aligned even if rows are appended while reading.
+        """
+        rows = len(self)
+        return {name: self.column(name, rows) for name in columns or self.schema}
+
+    def records(self, start=0, stop=None):
+        """Rebuild record objects for a range of rows"""
+        data = self.read()
+        stop = len(next(iter(data.values()))) if stop is None else stop
+        for index in range(start, stop):
+            values = {}
+            for name, column in data.items():
+                value = column[index]
+                values[name] = value.item() if isinstance(value, np.generic) else value
+            yield self.record_type(**values)
+
+
+_default_store = None
+
+
+def default_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = ResultStore()
+    return _default_store
+
+
+def record_result(url, result, analysis):
+    """Append a finished analysis to the default result store"""
+    default_store().append([BrandRecord.from_result(url, result, analysis, time.time())])
@@ -0,0 +1,84 @@
+import threading
+
+_groups = {}
+
+
+class FlightTimeout(TimeoutError):
+    """A waiter gave up before the shared call finished"""
+
+
+class _Call:
+    """A single in-flight execution shared by every caller with the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run concurrent calls with the same key once and share the outcome"""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        _groups[name] = self
+
+    def do(self, key, fn, *args, wait_timeout=None, **kwargs):
+        """Call fn, or wait for an identical in-flight call and return its result
+
+        A waiter gets the leader's outcome, which was produced under the
+        leader's budget; wait_timeout bounds how long this caller waits for it
+        before FlightTimeout is raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            if not call.done.wait(wait_timeout):
+                with self._lock:
+                    call.waiters -= 1
+                raise FlightTimeout(
+                    f"Gave up after {wait_timeout:.1f}s waiting for a shared {self.name} call"
+                )
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def snapshot(self):
+        """Current coalescing counters for this group"""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
+
+
+def coalescing_stats():
+    """Counters for every single-flight group"""
+    return {name: group.snapshot() for name, group in _groups.items()}
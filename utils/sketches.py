@@ -0,0 +1,126 @@
+import re
+import json
+import time
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from utils.storage import get_connection, get_lock
+
+# Sketch parameters; every sketch has the same size whatever the text length
+NUM_PERM = 64
+SHINGLE_SIZE = 3
+NUM_KEYWORDS = 20
+# Only the first MAX_WORDS words are sketched, which bounds construction cost
+MAX_WORDS = 2000
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+_BIT_SHIFTS = np.arange(64, dtype=np.uint64)
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "our",
+    "your", "you", "have", "has", "all", "not", "but", "can", "will", "more",
+    "its", "their", "they", "who", "what", "when", "where", "how", "about",
+    "into", "over", "than", "then", "them", "also", "just", "out", "any",
+}
+
+_DB_NAME = "sketches.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketches (
+    owner TEXT NOT NULL,
+    source TEXT NOT NULL,
+    sketch TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (owner, source)
+);
+"""
+
+
+def tokenize(text):
+    """Lower-cased word tokens, capped at MAX_WORDS"""
+    return re.findall(r"[a-z0-9]+", (text or "").lower())[:MAX_WORDS]
+
+
+def _hash(value, size):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=size).digest(), "little")
+
+
+def build_sketch(text):
+    """MinHash signature, 64-bit SimHash and keyword set for a document"""
+    words = tokenize(text)
+    if not words:
+        return None
+
+    shingles = {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(max(1, len(words) - SHINGLE_SIZE + 1))
+    }
+    hashes = np.array([_hash(s, 4) % _PRIME for s in shingles], dtype=np.uint64)
+    # (a * h + b) mod p for every permutation at once; values stay below 2^62
+    minhash = ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+    counts = Counter(w for w in words if len(w) > 2 and w not in STOPWORDS)
+    simhash = 0
+    if counts:
+        tokens, weights = zip(*counts.items())
+        token_hashes = np.array([_hash(t, 8) for t in tokens], dtype=np.uint64)
+        bits = ((token_hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).astype(np.int64)
+        totals = (np.array(weights)[:, None] * (2 * bits - 1)).sum(axis=0)
+        simhash = sum(1 << i for i in range(64) if totals[i] > 0)
+
+    return {
+        "minhash": minhash.tolist(),
+        "simhash": simhash,
+        "keywords": [w for w, _ in counts.most_common(NUM_KEYWORDS)],
+        "words": len(words),
+    }
+
+
+def compare_sketches(a, b):
+    """Similarity components between two sketches, each in [0, 1]"""
+    minhash = float(np.mean(np.array(a["minhash"]) == np.array(b["minhash"])))
+    hamming = bin(a["simhash"] ^ b["simhash"]).count("1")
+    # Unrelated texts agree on about half the bits, so rescale 0.5..1 to 0..1
+    simhash = max(0.0, (1 - hamming / 64) - 0.5) * 2
+    ka, kb = set(a["keywords"]), set(b["keywords"])
+    keywords = len(ka & kb) / min(len(ka), len(kb)) if ka and kb else 0.0
+    return {"minhash": minhash, "simhash": simhash, "keywords": keywords}
+
+
+def similarity(a, b):
+    """Single weighted similarity score between two sketches"""
+    parts = compare_sketches(a, b)
+    return 0.3 * parts["minhash"] + 0.3 * parts["simhash"] + 0.4 * parts["keywords"]
+
+
+def save_sketch(owner, source, sketch):
+    """Persist a sketch so later comparisons don't need the raw text"""
+    with get_lock(_DB_NAME):
+        get_connection(_DB_NAME, _SCHEMA).execute(
+            "INSERT OR REPLACE INTO sketches (owner, source, sketch, updated_at) VALUES (?, ?, ?, ?)",
+            (owner, source, json.dumps(sketch), time.time()),
+        )
+
+
+def load_sketches(owner):
+    """All stored sketches for an owner, keyed by source"""
+    with get_lock(_DB_NAME):
+        rows = (
+            get_connection(_DB_NAME, _SCHEMA)
+            .execute("SELECT source, sketch FROM sketches WHERE owner = ?", (owner,))
+            .fetchall()
+        )
+    return {row["source"]: json.loads(row["sketch"]) for row in rows}
+
+
+def compare_brands(owner_a, owner_b, source="website"):
+    """Similarity of two previously analyzed brands from their stored sketches"""
+    a = load_sketches(owner_a).get(source)
+    b = load_sketches(owner_b).get(source)
+    if not a or not b:
+        return None
+    return round(similarity(a, b), 3)
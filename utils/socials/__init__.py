@@ -1,21 +1,27 @@
 import re
-import requests
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from typing import Dict, List, Any, Optional
 
-from .common import identify_platform, PLATFORMS, extract_username_from_url
+from utils.http import fetch
+from utils.deadline import Deadline, timeout_for, note_failure
+
+from .common import identify_platform, PLATFORMS, REGISTRY, classify_url, extract_username_from_url
 from .twitter import get_twitter_data
 from .instagram import get_instagram_data
 from .youtube import get_youtube_data
 from .facebook import get_facebook_data
+from .store import get_fresh_profile, save_profile, profile_key, follower_growth
+
+# Remaining budget below which further platforms are skipped (seconds)
+MIN_PLATFORM_BUDGET = 2.0
 
 # Constants
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
 }
 
-def extract_social_content(social_links: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+def extract_social_content(social_links: List[Dict[str, str]], deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
     """Extract content from social media platforms using platform-specific modules"""
     if not social_links:
         return []
@@ -39,14 +45,30 @@ def extract_social_content(social_links: List[Dict[str, str]]) -> List[Dict[str,
             if not platform:
                 continue
             
-            # Get data using platform-specific modules
-            platform_data = extract_with_api(url, platform)
+            # Serve from the profile store while the record is still fresh
+            key = profile_key(url, platform)
+            platform_data = get_fresh_profile(platform, key)
             
-            # Fallback to basic scraping if API extraction fails
             if not platform_data:
-                platform_data = extract_with_scraping(url, platform)
+                # Skip remaining platforms once the request budget is nearly spent
+                if deadline and not deadline.has_budget(MIN_PLATFORM_BUDGET):
+                    deadline.mark_truncated(f"social:{platform}")
+                    continue
+                
+                # Get data using platform-specific modules
+                platform_data = extract_with_api(url, platform, deadline)
+                
+                # Fallback to basic scraping if API extraction fails
+                if not platform_data:
+                    platform_data = extract_with_scraping(url, platform, deadline)
+                    
+                if platform_data:
+                    save_profile(platform, key, platform_data)
                 
             if platform_data:
+                growth = follower_growth(platform, key)
+                if growth:
+                    platform_data["growth"] = growth
                 social_content.append(platform_data)
                 
         except Exception as e:
@@ -54,10 +76,10 @@ def extract_social_content(social_links: List[Dict[str, str]]) -> List[Dict[str,
             
     return social_content
 
-def extract_with_scraping(url: str, platform: str) -> Optional[Dict[str, Any]]:
+def extract_with_scraping(url: str, platform: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Basic scraping fallback method"""
     try:
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
+        response = fetch(url, headers=DEFAULT_HEADERS, timeout=timeout_for(deadline, 10, f"social:{platform}"))
         if response.status_code != 200:
             return None
             
@@ -83,27 +105,30 @@ def extract_with_scraping(url: str, platform: str) -> Optional[Dict[str, Any]]:
             "content": f"Content from {platform.capitalize()}"
         }
     except Exception:
+        note_failure(deadline, f"social:{platform}")
         return None
 
-def extract_with_api(url: str, platform: str) -> Optional[Dict[str, Any]]:
+def extract_with_api(url: str, platform: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Extract data using platform-specific APIs"""
     username = extract_username_from_url(url, platform)
     
     # Process based on platform
     if platform == "twitter" or platform == "x":
-        return get_twitter_data(username) if username else None
+        return get_twitter_data(username, deadline) if username else None
     elif platform == "instagram":
-        return get_instagram_data(username) if username else None
+        return get_instagram_data(username, deadline) if username else None
     elif platform == "youtube":
-        return get_youtube_data(url)
+        return get_youtube_data(url, deadline)
     elif platform == "facebook":
-        return get_facebook_data(url, username)
+        return get_facebook_data(url, username, deadline)
     
     return None
 
 __all__ = [
     'identify_platform',
-    'PLATFORMS', 
+    'classify_url',
+    'PLATFORMS',
+    'REGISTRY',
     'extract_username_from_url',
     'get_twitter_data', 
     'get_instagram_data', 
@@ -111,5 +136,9 @@ __all__ = [
     'get_facebook_data',
     'extract_social_content',
     'extract_with_scraping',
-    'extract_with_api'
+    'extract_with_api',
+    'get_fresh_profile',
+    'save_profile',
+    'profile_key',
+    'follower_growth'
 ]
@@ -1,14 +1,15 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 from typing import Dict, Any, Optional
 
+from utils.http import fetch
+from utils.deadline import Deadline, timeout_for, note_failure
 from .common import DEFAULT_HEADERS, PLATFORMS
 
-def get_facebook_data(url: str, page_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def get_facebook_data(url: str, page_id: Optional[str] = None, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get Facebook page data through scraping"""
     try:
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
+        response = fetch(url, headers=DEFAULT_HEADERS, timeout=timeout_for(deadline, 10, "social:facebook"))
         if response.status_code != 200:
             return None
             
@@ -30,6 +31,10 @@ def get_facebook_data(url: str, page_id: Optional[str] = None) -> Optional[Dict[
         elif page_id:
             page_name = page_id
         
+        # Page description, used for consistency scoring
+        meta_desc = soup.find("meta", property="og:description") or soup.find("meta", {"name": "description"})
+        bio = meta_desc.get("content", "").strip() if meta_desc else ""
+        
         return {
             "platform": "Facebook",
             "type": "page",
@@ -39,7 +44,9 @@ def get_facebook_data(url: str, page_id: Optional[str] = None) -> Optional[Dict[
             "frequency": "Weekly",   # Default
             "url": url,
             "content": f"Content from Facebook page: {page_name}",
+            "bio": bio,
             "real_data": follower_match is not None
         }
     except Exception:
+        note_failure(deadline, "social:facebook")
         return None
@@ -1,9 +1,10 @@
-import requests
 from typing import Dict, Any, Optional
 
+from utils.http import fetch
+from utils.deadline import Deadline, timeout_for, note_failure
 from .common import DEFAULT_HEADERS
 
-def get_instagram_data(username: str) -> Optional[Dict[str, Any]]:
+def get_instagram_data(username: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get Instagram profile data"""
     if not username:
         return None
@@ -16,14 +17,14 @@ def get_instagram_data(username: str) -> Optional[Dict[str, Any]]:
         
         url = f"https://www.instagram.com/api/v1/users/web_profile_info/?username={username}"
         
-        response = requests.get(url, headers=headers)
+        response = fetch(url, headers=headers, timeout=timeout_for(deadline, 10, "social:instagram"))
         if response.status_code != 200:
-            return _get_instagram_scrape_data(username)
+            return _get_instagram_scrape_data(username, deadline)
             
         data = response.json()
         user = data.get("data", {}).get("user", {})
         if not user:
-            return _get_instagram_scrape_data(username)
+            return _get_instagram_scrape_data(username, deadline)
             
         followers = user.get("edge_followed_by", {}).get("count", 0)
         
@@ -31,6 +32,7 @@ def get_instagram_data(username: str) -> Optional[Dict[str, Any]]:
             "platform": "Instagram",
             "type": "profile",
             "username": user.get("username", ""),
+            "bio": user.get("biography", ""),
             "followers": str(followers),
             "engagement": "Medium",
             "frequency": "Weekly",
@@ -38,13 +40,13 @@ def get_instagram_data(username: str) -> Optional[Dict[str, Any]]:
             "real_data": True
         }
     except Exception:
-        return _get_instagram_scrape_data(username)
+        return _get_instagram_scrape_data(username, deadline)
 
-def _get_instagram_scrape_data(username: str) -> Optional[Dict[str, Any]]:
+def _get_instagram_scrape_data(username: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Fallback to scraping Instagram data"""
     try:
         url = f"https://www.instagram.com/{username}/"
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
+        response = fetch(url, headers=DEFAULT_HEADERS, timeout=timeout_for(deadline, 10, "social:instagram"))
         
         return {
             "platform": "Instagram",
@@ -57,4 +59,5 @@ def _get_instagram_scrape_data(username: str) -> Optional[Dict[str, Any]]:
             "real_data": False
         }
     except Exception:
+        note_failure(deadline, "social:instagram")
         return None
@@ -0,0 +1,90 @@
+import re
+from typing import Dict, Any, NamedTuple, Optional
+
+class PlatformMatch(NamedTuple):
+    platform: str
+    username: Optional[str]
+
+class PlatformRegistry:
+    """Compiled platform definitions with a suffix trie over host labels
+
+    A URL is classified with one walk over its host labels (right to left), so
+    "m.facebook.com" matches facebook.com while "box.com" does not match x.com.
+    The username is extracted in the same call from the platform's path pattern.
+    """
+
+    # Key for "a domain ends here"; not a string, so no host label can collide with it
+    _TERMINAL = object()
+    _MISSING = object()
+    HOST_CACHE_SIZE = 4096
+
+    def __init__(self, platforms: Dict[str, Dict[str, Any]]):
+        self._trie: Dict[str, Any] = {}
+        self._username_patterns = {}
+        self._reserved = {}
+        self._host_cache: Dict[str, Optional[str]] = {}
+        for platform, config in platforms.items():
+            for domain in config["domains"]:
+                self._add_domain(domain, platform)
+            username = config.get("username")
+            self._username_patterns[platform] = re.compile(username) if username else None
+            self._reserved[platform] = frozenset(config.get("reserved", ()))
+
+    def _add_domain(self, domain: str, platform: str) -> None:
+        node = self._trie
+        for label in reversed(domain.lower().split(".")):
+            node = node.setdefault(label, {})
+        node[self._TERMINAL] = platform
+
+    def match_host(self, host: str) -> Optional[str]:
+        """Platform for a host name, matching whole labels only"""
+        cached = self._host_cache.get(host, self._MISSING)
+        if cached is not self._MISSING:
+            return cached
+
+        node = self._trie
+        platform = None
+        name = host.lower().rstrip(".")
+        # Empty labels ("www..facebook.com", ".x.com") mean a malformed host, not a platform
+        labels = [] if name.startswith(".") or ".." in name else reversed(name.split("."))
+        for label in labels:
+            node = node.get(label)
+            if node is None:
+                break
+            platform = node.get(self._TERMINAL, platform)
+
+        if len(self._host_cache) >= self.HOST_CACHE_SIZE:
+            self._host_cache.clear()
+        self._host_cache[host] = platform
+        return platform
+
+    def classify(self, url: str) -> Optional[PlatformMatch]:
+        """Identify the platform of a URL and extract its username in one step"""
+        if not url:
+            return None
+
+        # Split "scheme://[user@]host[:port]/path" by hand; urlsplit dominates otherwise
+        start = url.find("://")
+        if start < 0:
+            return None
+        start += 3
+        end = len(url)
+        for delimiter in "/?#":
+            index = url.find(delimiter, start)
+            if index != -1 and index < end:
+                end = index
+        host = url[start:end].rpartition("@")[2].partition(":")[0]
+        if not host:
+            return None
+
+        platform = self.match_host(host)
+        if platform is None:
+            return None
+
+        username = None
+        pattern = self._username_patterns.get(platform)
+        if pattern:
+            match = pattern.match(url, end)
+            if match and match.group(1).lower() not in self._reserved[platform]:
+                username = match.group(1)
+        return PlatformMatch(platform, username)
@@ -0,0 +1,158 @@
+import os
+import re
+import json
+import time
+from typing import Dict, List, Any, Optional
+
+from utils.storage import get_connection, get_lock
+from .common import extract_username_from_url
+from .youtube import _extract_channel_info
+
+# How long a stored profile is served before it is fetched again (seconds)
+PLATFORM_TTLS = {
+    "twitter": 6 * 3600,
+    "instagram": 6 * 3600,
+    "youtube": 12 * 3600,
+    "facebook": 12 * 3600,
+}
+DEFAULT_TTL = 6 * 3600
+# Placeholder records (no real_data, e.g. after a rate-limited call) are retried much sooner
+PLACEHOLDER_TTL = 10 * 60
+HISTORY_LIMIT = 30
+
+_DB_NAME = "social_profiles.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    platform TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (platform, key)
+);
+CREATE TABLE IF NOT EXISTS profile_history (
+    platform TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    followers INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profile_history
+    ON profile_history (platform, key, fetched_at);
+"""
+
+def _db():
+    return get_connection(_DB_NAME, _SCHEMA)
+
+def _normalize_platform(platform: str) -> str:
+    platform = platform.lower()
+    return "twitter" if platform == "x" else platform
+
+def get_ttl(platform: str) -> int:
+    """Freshness TTL for a platform, overridable with NARRATIX_TTL_<PLATFORM>"""
+    platform = _normalize_platform(platform)
+    override = os.environ.get(f"NARRATIX_TTL_{platform.upper()}")
+    if override:
+        try:
+            return int(override)
+        except ValueError:
+            pass
+    return PLATFORM_TTLS.get(platform, DEFAULT_TTL)
+
+def profile_key(url: str, platform: str) -> str:
+    """Stable store key for a profile: username, channel id or the URL path"""
+    platform = _normalize_platform(platform)
+    if platform == "youtube":
+        # Channel ids are case-sensitive, usernames are not
+        channel_id, username = _extract_channel_info(url)
+        if channel_id:
+            return channel_id
+        key = username
+    else:
+        key = extract_username_from_url(url, platform)
+    if not key:
+        key = re.sub(r"^https?://(www\.)?", "", url).rstrip("/")
+    return key.lower()
+
+def parse_follower_count(value: Any) -> Optional[int]:
+    """Convert follower strings such as '12,345' or '1.2M' to an integer"""
+    if isinstance(value, int):
+        return value
+    match = re.search(r"([\d,.]+)\s*([kKmM]?)", str(value or ""))
+    if not match:
+        return None
+    try:
+        number = float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(match.group(2).lower(), 1)
+    return int(number * multiplier)
+
+def get_fresh_profile(platform: str, key: str) -> Optional[Dict[str, Any]]:
+    """Return the stored profile if it is younger than its TTL
+
+    Real profiles use the platform TTL; placeholders expire after PLACEHOLDER_TTL.
+    """
+    platform = _normalize_platform(platform)
+    with get_lock(_DB_NAME):
+        row = _db().execute(
+            "SELECT data, fetched_at FROM profiles WHERE platform = ? AND key = ?",
+            (platform, key),
+        ).fetchone()
+    if not row:
+        return None
+    data = json.loads(row["data"])
+    ttl = get_ttl(platform)
+    if not data.get("real_data"):
+        ttl = min(ttl, PLACEHOLDER_TTL)
+    if time.time() - row["fetched_at"] > ttl:
+        return None
+    return data
+
+def save_profile(platform: str, key: str, data: Dict[str, Any]) -> None:
+    """Store the latest profile record and append its follower count to the history"""
+    platform = _normalize_platform(platform)
+    now = time.time()
+    followers = parse_follower_count(data.get("followers")) if data.get("real_data") else None
+    record = {k: v for k, v in data.items() if k != "growth"}
+    with get_lock(_DB_NAME):
+        db = _db()
+        db.execute(
+            "INSERT OR REPLACE INTO profiles (platform, key, data, fetched_at) VALUES (?, ?, ?, ?)",
+            (platform, key, json.dumps(record), now),
+        )
+        if followers is not None:
+            db.execute(
+                "INSERT INTO profile_history (platform, key, fetched_at, followers) VALUES (?, ?, ?, ?)",
+                (platform, key, now, followers),
+            )
+            # Keep only the most recent HISTORY_LIMIT samples
+            db.execute(
+                """DELETE FROM profile_history WHERE platform = ? AND key = ? AND fetched_at NOT IN (
+                    SELECT fetched_at FROM profile_history WHERE platform = ? AND key = ?
+                    ORDER BY fetched_at DESC LIMIT ?)""",
+                (platform, key, platform, key, HISTORY_LIMIT),
+            )
+
+def get_history(platform: str, key: str, limit: int = HISTORY_LIMIT) -> List[Dict[str, Any]]:
+    """Follower samples for a profile, oldest first"""
+    platform = _normalize_platform(platform)
+    with get_lock(_DB_NAME):
+        rows = _db().execute(
+            """SELECT fetched_at, followers FROM profile_history WHERE platform = ? AND key = ?
+            ORDER BY fetched_at DESC LIMIT ?""",
+            (platform, key, limit),
+        ).fetchall()
+    return [{"fetched_at": r["fetched_at"], "followers": r["followers"]} for r in reversed(rows)]
+
+def follower_growth(platform: str, key: str) -> Optional[Dict[str, Any]]:
+    """Follower change between the oldest and newest stored samples"""
+    history = get_history(platform, key)
+    if len(history) < 2:
+        return None
+    first, last = history[0], history[-1]
+    change = last["followers"] - first["followers"]
+    return {
+        "since": first["fetched_at"],
+        "change": change,
+        "percent": round(100.0 * change / first["followers"], 2) if first["followers"] else None,
+        "samples": len(history),
+    }
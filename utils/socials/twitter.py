@@ -3,9 +3,11 @@ import json
 import requests
 from typing import Dict, Any, Optional
 
+from utils.http import fetch
+from utils.deadline import Deadline, timeout_for, note_failure
 from .common import DEFAULT_HEADERS
 
-def get_twitter_data(username: str) -> Optional[Dict[str, Any]]:
+def get_twitter_data(username: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get Twitter profile data using API or scraping"""
     bearer_token = os.environ.get("TWITTER_BEARER_TOKEN")
     if not username:
@@ -13,20 +15,21 @@ def get_twitter_data(username: str) -> Optional[Dict[str, Any]]:
         
     # Try API method first if token available
     if bearer_token:
-        result = _get_twitter_api_data(username, bearer_token)
+        result = _get_twitter_api_data(username, bearer_token, deadline)
         if result:
             return result
     
     # Fallback to scraping
-    return _get_twitter_scrape_data(username)
+    return _get_twitter_scrape_data(username, deadline)
 
-def _get_twitter_api_data(username: str, bearer_token: str) -> Optional[Dict[str, Any]]:
+def _get_twitter_api_data(username: str, bearer_token: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get Twitter data using API"""
     try:
         # Get guest token for unauthenticated access
         response = requests.post(
             "https://api.twitter.com/1.1/guest/activate.json",
-            headers={"Authorization": f"Bearer {bearer_token}"}
+            headers={"Authorization": f"Bearer {bearer_token}"},
+            timeout=timeout_for(deadline, 10, "social:twitter"),
         )
         
         if response.status_code != 200:
@@ -47,7 +50,7 @@ def _get_twitter_api_data(username: str, bearer_token: str) -> Optional[Dict[str
         
         endpoint = f"https://api.twitter.com/graphql/NimuplG1OB7Fd2btCLdBOw/UserByScreenName?variables={variables}&features={features}"
         
-        response = requests.get(endpoint, headers=headers)
+        response = fetch(endpoint, headers=headers, timeout=timeout_for(deadline, 10, "social:twitter"))
         if response.status_code != 200:
             return None
             
@@ -63,6 +66,7 @@ def _get_twitter_api_data(username: str, bearer_token: str) -> Optional[Dict[str
             "platform": "Twitter",
             "type": "profile",
             "username": legacy.get("screen_name", ""),
+            "bio": legacy.get("description", ""),
             "followers": str(legacy.get("followers_count", 0)),
             "engagement": "Medium",
             "frequency": "Weekly",
@@ -70,13 +74,14 @@ def _get_twitter_api_data(username: str, bearer_token: str) -> Optional[Dict[str
             "real_data": True
         }
     except Exception:
+        note_failure(deadline, "social:twitter")
         return None
 
-def _get_twitter_scrape_data(username: str) -> Optional[Dict[str, Any]]:
+def _get_twitter_scrape_data(username: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get Twitter data via scraping as fallback"""
     try:
         url = f"https://twitter.com/{username}"
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
+        response = fetch(url, headers=DEFAULT_HEADERS, timeout=timeout_for(deadline, 10, "social:twitter"))
         
         # Basic return with minimal data
         return {
@@ -90,4 +95,5 @@ def _get_twitter_scrape_data(username: str) -> Optional[Dict[str, Any]]:
             "real_data": False
         }
     except Exception:
+        note_failure(deadline, "social:twitter")
         return None
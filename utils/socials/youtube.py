@@ -1,13 +1,14 @@
 import os
-import requests
 from bs4 import BeautifulSoup
 import re
 from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
+from utils.http import fetch
+from utils.deadline import Deadline, timeout_for, note_failure
 from .common import DEFAULT_HEADERS
 
-def get_youtube_data(url: str) -> Optional[Dict[str, Any]]:
+def get_youtube_data(url: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get YouTube channel data"""
     try:
         channel_id, username = _extract_channel_info(url)
@@ -15,7 +16,7 @@ def get_youtube_data(url: str) -> Optional[Dict[str, Any]]:
         # Try API if key is available
         api_key = os.environ.get("YOUTUBE_API_KEY")
         if api_key and (channel_id or username):
-            data = _get_youtube_api_data(channel_id, username, api_key)
+            data = _get_youtube_api_data(channel_id, username, api_key, deadline)
             if data:
                 return data
         
@@ -58,7 +59,7 @@ def _extract_channel_info(url: str) -> Tuple[Optional[str], Optional[str]]:
         
     return channel_id, username
 
-def _get_youtube_api_data(channel_id: Optional[str], username: Optional[str], api_key: str) -> Optional[Dict[str, Any]]:
+def _get_youtube_api_data(channel_id: Optional[str], username: Optional[str], api_key: str, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
     """Get YouTube data using API"""
     try:
         if channel_id:
@@ -68,7 +69,7 @@ def _get_youtube_api_data(channel_id: Optional[str], username: Optional[str], ap
         else:
             return None
             
-        response = requests.get(endpoint, timeout=10)
+        response = fetch(endpoint, headers={}, timeout=timeout_for(deadline, 10, "social:youtube"))
         if response.status_code != 200:
             return None
             
@@ -85,6 +86,7 @@ def _get_youtube_api_data(channel_id: Optional[str], username: Optional[str], ap
             "platform": "YouTube",
             "type": "channel",
             "username": snippet.get("title", username or ""),
+            "bio": snippet.get("description", ""),
             "followers": stats.get("subscriberCount", "0"),
             "engagement": "Medium",
             "frequency": "Weekly",
@@ -92,4 +94,5 @@ def _get_youtube_api_data(channel_id: Optional[str], username: Optional[str], ap
             "real_data": True
         }
     except Exception:
+        note_failure(deadline, "social:youtube")
         return None
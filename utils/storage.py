@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import threading
+
+# Directory for all persistent Narratix data (profile store, indexes, reports)
+DATA_DIR = os.environ.get("NARRATIX_DATA_DIR", os.path.join(os.getcwd(), ".narratix"))
+
+_connections = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def data_path(name):
+    """Return a path inside the data directory, creating the directory if needed
+
+    Absolute paths (e.g. databases on a shared filesystem) are returned unchanged.
+    """
+    if os.path.isabs(name):
+        return name
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def get_connection(name, schema=""):
+    """Return a shared SQLite connection for a named database, creating its schema once"""
+    with _registry_lock:
+        conn = _connections.get(name)
+        if conn is None:
+            conn = sqlite3.connect(
+                data_path(name), check_same_thread=False, isolation_level=None
+            )
+            conn.row_factory = sqlite3.Row
+            if schema:
+                conn.executescript(schema)
+            _connections[name] = conn
+            # get_lock() may already have handed this lock out; never replace it
+            _locks.setdefault(name, threading.RLock())
+        return conn
+
+
+def get_lock(name):
+    """Return the lock that serializes access to a named database connection"""
+    with _registry_lock:
+        return _locks.setdefault(name, threading.RLock())
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+"""
+Scheduled incremental re-analysis of tracked brands.
+
+Each refresh re-crawls the site and hashes the inputs of every stage (page
+content, per-platform social data, the analyzer output, the brand story
+prompt). A stage only reruns when its inputs changed; otherwise its stored
+output is reused. Every refresh records a diff against the previous result.
+
+Usage:
+    python -m utils.tracking add https://example.com [--interval HOURS]
+    python -m utils.tracking remove https://example.com
+    python -m utils.tracking list
+    python -m utils.tracking run      # scheduler loop
+    python -m utils.tracking once     # refresh whatever is due now and exit
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+from utils.storage import get_connection, get_lock
+from utils.deadline import Deadline
+from utils.crawler import extract_website_content, extract_social_links, normalize_url
+from utils.socials import extract_social_content
+from utils.analyzer import analyze_content
+from utils.llm_providers import (
+    LLM_MIN_BUDGET,
+    create_brand_story_prompt,
+    generate_with_llm,
+    template_brand_story,
+)
+from utils.llm_providers.batch import generate_brand_stories
+from utils.visuals import generate_visual_profile, generate_consistency_score
+from utils.pipeline import assemble_result
+from utils.resultstore import record_result
+
+DEFAULT_INTERVAL = 24 * 3600
+# Background refreshes are not user-facing, so they get a larger budget
+REFRESH_BUDGET = float(os.environ.get("NARRATIX_REFRESH_BUDGET", "120"))
+# Upper bound on refreshes started per scheduler tick, which smooths bursts
+MAX_PER_TICK = int(os.environ.get("NARRATIX_REFRESH_PER_TICK", "4"))
+POLL_INTERVAL = 30
+# Delay before retrying a failed refresh; doubles per consecutive failure, capped at the interval
+FAILURE_BACKOFF = 300
+
+_DB_NAME = "tracking.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked (
+    url TEXT PRIMARY KEY,
+    interval REAL NOT NULL,
+    next_run REAL NOT NULL,
+    last_run REAL,
+    state TEXT,
+    result TEXT,
+    failures INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tracked_next_run ON tracked (next_run);
+CREATE TABLE IF NOT EXISTS refreshes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    ran_at REAL NOT NULL,
+    rerun_stages TEXT NOT NULL,
+    diff TEXT NOT NULL
+);
+"""
+
+
+# Columns added after the first release, for databases created before them
+_ADDED_COLUMNS = {
+    "failures": "INTEGER NOT NULL DEFAULT 0",
+    "last_error": "TEXT",
+}
+_migrated = False
+
+
+def _db():
+    global _migrated
+    db = get_connection(_DB_NAME, _SCHEMA)
+    if not _migrated:
+        with get_lock(_DB_NAME):
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(tracked)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    db.execute(f"ALTER TABLE tracked ADD COLUMN {name} {definition}")
+            _migrated = True
+    return db
+
+
+def stage_hash(*inputs):
+    """Stable digest of a stage's inputs"""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _phase(url, interval):
+    """Stable offset within the interval so tracked brands don't all refresh together"""
+    digest = int(hashlib.sha256(url.encode("utf-8")).hexdigest()[:8], 16)
+    return digest % max(int(interval), 1)
+
+
+def track(url, interval=DEFAULT_INTERVAL):
+    """Start tracking a brand; its first refresh is spread across the interval"""
+    if interval <= 0:
+        raise ValueError("Refresh interval must be positive")
+    url = normalize_url(url)
+    next_run = time.time() + _phase(url, interval)
+    with get_lock(_DB_NAME):
+        _db().execute(
+            """INSERT INTO tracked (url, interval, next_run) VALUES (?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET interval = excluded.interval""",
+            (url, interval, next_run),
+        )
+    return url
+
+
+def untrack(url):
+    with get_lock(_DB_NAME):
+        _db().execute("DELETE FROM tracked WHERE url = ?", (normalize_url(url),))
+
+
+def tracked_brands():
+    with get_lock(_DB_NAME):
+        rows = _db().execute(
+            "SELECT url, interval, next_run, last_run, failures, last_error FROM tracked ORDER BY next_run"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def get_refreshes(url, limit=10):
+    """Most recent refresh diffs for a brand"""
+    with get_lock(_DB_NAME):
+        rows = _db().execute(
+            "SELECT ran_at, rerun_stages, diff FROM refreshes WHERE url = ? ORDER BY ran_at DESC LIMIT ?",
+            (normalize_url(url), limit),
+        ).fetchall()
+    return [
+        {
+            "ran_at": row["ran_at"],
+            "rerun_stages": json.loads(row["rerun_stages"]),
+            "diff": json.loads(row["diff"]),
+        }
+        for row in rows
+    ]
+
+
+def _reuse(state, stage, digest):
+    """Stored output of a stage if its input hash is unchanged"""
+    previous = state.get(stage)
+    if previous and previous["hash"] == digest:
+        return True, previous["output"]
+    return False, None
+
+
+def refresh(url, state, deadline=None, defer_story=False):
+    """Re-run only the stages whose inputs changed since the stored state
+
+    With defer_story=True a changed brand story is not generated here;
+    instead the story inputs are returned so several brands can share one
+    batched LLM request (see run_due).
+
+    Returns (result, new_state, rerun_stages, pending_story).
+    """
+    deadline = deadline or Deadline(REFRESH_BUDGET)
+    new_state, rerun, fallbacks = {}, [], set()
+
+    def stage(name, digest, compute):
+        reused, output = _reuse(state, name, digest)
+        if not reused:
+            output = compute()
+            rerun.append(name)
+        if name in fallbacks or name in deadline.truncated:
+            # A fallback output is served but not cached, so the next refresh retries
+            digest = None
+        new_state[name] = {"hash": digest, "output": output}
+        return output
+
+    # Crawling always runs; it produces the inputs everything else is keyed on
+    website_content = extract_website_content(url, deadline)
+    social_links = extract_social_links(url, deadline)
+    social_content = extract_social_content(social_links, deadline)
+
+    page_hash = stage_hash(website_content)
+    social_hashes = {
+        s.get("platform", ""): stage_hash({k: v for k, v in s.items() if k != "growth"})
+        for s in social_content
+    }
+
+    analysis = stage(
+        "analysis",
+        stage_hash(page_hash, social_hashes),
+        lambda: analyze_content(website_content, social_content),
+    )
+
+    brand_name = website_content.get("brand_name", "Brand")
+    description = website_content.get("description", "")
+    prompt = create_brand_story_prompt(brand_name, description, analysis, social_content)
+
+    def compute_story():
+        if defer_story:
+            return None  # Filled in by the batched generation in run_due
+        story = None
+        if deadline.has_budget(LLM_MIN_BUDGET):
+            story = generate_with_llm(
+                brand_name, description, analysis, social_content, deadline
+            )
+        if story:
+            return story
+        fallbacks.add("brand_story")
+        return template_brand_story(brand_name, description, analysis, social_content)
+
+    brand_story = stage("brand_story", stage_hash(prompt), compute_story)
+    pending_story = None
+    if defer_story and "brand_story" in rerun:
+        pending_story = {
+            "brand_name": brand_name,
+            "description": description,
+            "analysis": analysis,
+            "social_content": social_content,
+        }
+    visual_profile = stage(
+        "visual_profile",
+        stage_hash(page_hash, analysis.get("tone_analysis")),
+        lambda: generate_visual_profile(analysis, website_content, deadline),
+    )
+    consistency_score = stage(
+        "consistency_score",
+        stage_hash(page_hash, social_hashes),
+        lambda: generate_consistency_score(
+            website_content, social_content, analysis, url
+        ),
+    )
+
+    result = assemble_result(
+        website_content,
+        social_links,
+        social_content,
+        analysis,
+        brand_story,
+        visual_profile,
+        consistency_score,
+    )
+    result["truncated"] = deadline.truncated
+    return result, new_state, rerun, pending_story
+
+
+def diff_results(old, new):
+    """What changed between two results of the same brand"""
+    if not old:
+        return {"initial": True}
+
+    old_followers = {s["platform"]: s.get("followers") for s in old.get("social_analytics", [])}
+    new_followers = {s["platform"]: s.get("followers") for s in new.get("social_analytics", [])}
+    followers = {
+        platform: {"from": old_followers.get(platform), "to": new_followers.get(platform)}
+        for platform in set(old_followers) | set(new_followers)
+        if old_followers.get(platform) != new_followers.get(platform)
+    }
+    old_keywords, new_keywords = set(old.get("keywords", [])), set(new.get("keywords", []))
+
+    diff = {}
+    if followers:
+        diff["followers"] = followers
+    if old_keywords != new_keywords:
+        diff["keywords"] = {
+            "added": sorted(new_keywords - old_keywords),
+            "removed": sorted(old_keywords - new_keywords),
+        }
+    for field in ("brand_name", "brand_description", "consistency_score", "brand_story", "visual_profile"):
+        if old.get(field) != new.get(field):
+            diff[field] = (
+                {"changed": True}
+                if field in ("brand_story", "visual_profile")
+                else {"from": old.get(field), "to": new.get(field)}
+            )
+    return diff
+
+
+def _prepare_refresh(url, defer_story=False):
+    """Run the refresh stages for a tracked brand without saving anything"""
+    with get_lock(_DB_NAME):
+        row = _db().execute("SELECT * FROM tracked WHERE url = ?", (url,)).fetchone()
+    if row is None:
+        return None
+
+    state = json.loads(row["state"]) if row["state"] else {}
+    result, new_state, rerun, pending_story = refresh(url, state, defer_story=defer_story)
+    return {
+        "row": row,
+        "result": result,
+        "state": new_state,
+        "rerun": rerun,
+        "pending_story": pending_story,
+    }
+
+
+def _save_refresh(refreshed):
+    """Store a refreshed brand's state, schedule its next run and record the diff"""
+    row, result, rerun = refreshed["row"], refreshed["result"], refreshed["rerun"]
+    url = row["url"]
+    old_result = json.loads(row["result"]) if row["result"] else None
+    diff = diff_results(old_result, result)
+
+    now = time.time()
+    next_run = row["next_run"]
+    while next_run <= now:
+        next_run += row["interval"]  # Keep the brand's phase within the interval
+
+    with get_lock(_DB_NAME):
+        db = _db()
+        db.execute(
+            """UPDATE tracked SET state = ?, result = ?, last_run = ?, next_run = ?,
+            failures = 0, last_error = NULL WHERE url = ?""",
+            (json.dumps(refreshed["state"]), json.dumps(result), now, next_run, url),
+        )
+        db.execute(
+            "INSERT INTO refreshes (url, ran_at, rerun_stages, diff) VALUES (?, ?, ?, ?)",
+            (url, now, json.dumps(rerun), json.dumps(diff)),
+        )
+    record_result(url, result, refreshed["state"]["analysis"]["output"])
+    return {"url": url, "rerun_stages": rerun, "diff": diff}
+
+
+def _record_failure(url, error):
+    """Push a failed brand's next run back so it doesn't hog every tick"""
+    with get_lock(_DB_NAME):
+        db = _db()
+        row = db.execute("SELECT interval, failures FROM tracked WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return
+        failures = row["failures"] + 1
+        delay = min(row["interval"], FAILURE_BACKOFF * 2 ** (failures - 1))
+        db.execute(
+            "UPDATE tracked SET next_run = ?, failures = ?, last_error = ? WHERE url = ?",
+            (time.time() + delay, failures, error, url),
+        )
+
+
+def refresh_tracked(url):
+    """Refresh one tracked brand, store its new state and record the diff"""
+    refreshed = _prepare_refresh(url)
+    return _save_refresh(refreshed) if refreshed else None
+
+
+def run_due(limit=MAX_PER_TICK, story_generator=None):
+    """Refresh up to `limit` brands whose next run is due, oldest first
+
+    Brand stories that need regenerating are produced together with batched
+    LLM requests; story_generator can replace the providers (e.g. in tests).
+    """
+    with get_lock(_DB_NAME):
+        rows = _db().execute(
+            "SELECT url FROM tracked WHERE next_run <= ? ORDER BY next_run LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+
+    prepared = []
+    for row in rows:
+        try:
+            refreshed = _prepare_refresh(row["url"], defer_story=True)
+            if refreshed:
+                prepared.append(refreshed)
+        except Exception as e:
+            print(f"Error refreshing {row['url']}: {str(e)}")
+            _record_failure(row["url"], str(e))
+
+    waiting = [r for r in prepared if r["pending_story"]]
+    if waiting:
+        stories, fallback = generate_brand_stories(
+            [r["pending_story"] for r in waiting], generator=story_generator
+        )
+        for refreshed, story, is_template in zip(waiting, stories, fallback):
+            refreshed["result"]["brand_story"] = story
+            refreshed["state"]["brand_story"]["output"] = story
+            if is_template:
+                # Not cached, so the story is retried on the next refresh
+                refreshed["state"]["brand_story"]["hash"] = None
+
+    return [_save_refresh(refreshed) for refreshed in prepared]
+
+
+def run_scheduler(poll_interval=POLL_INTERVAL):
+    """Refresh due brands forever, a few per tick"""
+    while True:
+        for report in run_due():
+            if report:
+                print(f"Refreshed {report['url']}: reran {', '.join(report['rerun_stages']) or 'nothing'}")
+        time.sleep(poll_interval)
+
+
+def positive_hours(value):
+    hours = float(value)
+    if hours <= 0:
+        raise argparse.ArgumentTypeError("interval must be a positive number of hours")
+    return hours
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Track brands and refresh them incrementally")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Track a brand")
+    add.add_argument("url")
+    add.add_argument("--interval", type=positive_hours, default=DEFAULT_INTERVAL / 3600, help="Hours between refreshes")
+    remove = sub.add_parser("remove", help="Stop tracking a brand")
+    remove.add_argument("url")
+    sub.add_parser("list", help="List tracked brands")
+    sub.add_parser("run", help="Run the scheduler loop")
+    sub.add_parser("once", help="Refresh brands that are due and exit")
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        print(f"Tracking {track(args.url, args.interval * 3600)}")
+    elif args.command == "remove":
+        untrack(args.url)
+    elif args.command == "list":
+        for brand in tracked_brands():
+            error = f"  ({brand['failures']} failures: {brand['last_error']})" if brand["failures"] else ""
+            print(f"{brand['url']}  next run {time.ctime(brand['next_run'])}{error}")
+    elif args.command == "run":
+        run_scheduler()
+    elif args.command == "once":
+        print(json.dumps(run_due(), indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
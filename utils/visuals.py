@@ -1,15 +1,321 @@
-def generate_visual_profile(analysis):
-    """Generate a simple visual profile with a dark theme"""
+import io
+import re
+import json
+import hashlib
+import colorsys
+from collections import Counter
+
+import numpy as np
+from PIL import Image
+
+from utils.http import fetch_bounded
+from utils.storage import get_connection, get_lock
+from utils.deadline import DeadlineExceeded, timeout_for
+from utils.sketches import build_sketch, similarity, save_sketch
+
+# Bounds that keep visual extraction inside the request budget
+MAX_STYLESHEETS = 3
+MAX_IMAGES = 2
+MAX_ASSET_BYTES = 2 * 1024 * 1024
+ASSET_TIMEOUT = 5
+MIN_VISUAL_BUDGET = 2.0
+# Images are downsampled to at most this many pixels per side before quantization
+IMAGE_SAMPLE_SIZE = 64
+# Larger images are not decoded at all; a small file can still declare huge dimensions
+MAX_IMAGE_PIXELS = 20_000_000
+PALETTE_SIZE = 5
+# Consistency score reported when there is no social text to compare against
+NEUTRAL_CONSISTENCY = 75
+
+DEFAULT_PALETTE = {
+    "primary": "#8A78EE",  # Purple
+    "secondary": "#6c63a3",  # Darker purple
+    "accent": "#f87171",  # Red
+}
+DEFAULT_FONT = "Poppins"
+DEFAULT_IMAGE_STYLE = (
+    "High contrast imagery with bold colors that stand out against dark backgrounds"
+)
+
+GENERIC_FONTS = {
+    "serif",
+    "sans-serif",
+    "monospace",
+    "cursive",
+    "fantasy",
+    "system-ui",
+    "ui-sans-serif",
+    "ui-serif",
+    "ui-monospace",
+    "inherit",
+    "initial",
+    "unset",
+    "-apple-system",
+    "blinkmacsystemfont",
+}
+SERIF_HINTS = ("serif", "times", "georgia", "garamond", "playfair", "merriweather", "lora")
+
+COLOR_RE = re.compile(
+    r"#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b"
+    r"|rgba?\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})\s*(?:,\s*([\d.]+%?)\s*)?\)"
+)
+FONT_RE = re.compile(r"font-family\s*:\s*([^;}\n]+)", re.IGNORECASE)
+
+_DB_NAME = "visual_assets.db"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS asset_cache (
+    digest TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+_memory_cache = {}
+MEMORY_CACHE_SIZE = 512
+
+
+def _cached(kind, content, parse):
+    """Parse an asset once per content hash; results persist across runs"""
+    digest = f"{kind}:{hashlib.sha256(content).hexdigest()}"
+    if digest in _memory_cache:
+        return _memory_cache[digest]
+
+    with get_lock(_DB_NAME):
+        row = (
+            get_connection(_DB_NAME, _SCHEMA)
+            .execute("SELECT data FROM asset_cache WHERE digest = ?", (digest,))
+            .fetchone()
+        )
+    if row:
+        result = json.loads(row["data"])
+    else:
+        result = parse(content)
+        with get_lock(_DB_NAME):
+            get_connection(_DB_NAME, _SCHEMA).execute(
+                "INSERT OR REPLACE INTO asset_cache (digest, data) VALUES (?, ?)",
+                (digest, json.dumps(result)),
+            )
+
+    if len(_memory_cache) >= MEMORY_CACHE_SIZE:
+        _memory_cache.clear()
+    _memory_cache[digest] = result
+    return result
+
+
+def parse_css(content):
+    """Count color and font-family declarations in a stylesheet"""
+    text = content.decode("utf-8", errors="ignore") if isinstance(content, bytes) else content
+    colors = Counter()
+    for match in COLOR_RE.finditer(text):
+        hex_value, r, g, b, alpha = match.groups()
+        if hex_value:
+            if len(hex_value) == 3:
+                hex_value = "".join(c * 2 for c in hex_value)
+            colors["#" + hex_value.lower()] += 1
+        else:
+            if alpha is not None and alpha.rstrip("%") in ("0", "0.0"):
+                continue
+            rgb = [min(int(v), 255) for v in (r, g, b)]
+            colors["#{:02x}{:02x}{:02x}".format(*rgb)] += 1
+
+    fonts = Counter()
+    for match in FONT_RE.finditer(text):
+        for family in match.group(1).split(","):
+            family = family.strip().strip("'\"").strip()
+            lowered = family.lower()
+            if (
+                not family
+                or lowered in GENERIC_FONTS
+                or lowered.startswith("var(")
+                or "awesome" in lowered
+                or "icon" in lowered
+            ):
+                continue
+            fonts[family] += 1
+            break  # Only the preferred family of each declaration
+
+    return {"colors": dict(colors), "fonts": dict(fonts)}
+
+
+def quantize_colors(pixels, k=PALETTE_SIZE, iterations=10):
+    """Vectorized k-means over an (N, 3) pixel array; returns (centers, weights)"""
+    pixels = np.asarray(pixels, dtype=np.float32)
+    if len(pixels) == 0:
+        return np.empty((0, 3), dtype=np.float32), np.empty(0)
+    k = min(k, len(pixels))
+
+    # Deterministic start: pixels at evenly spaced luminance quantiles
+    luminance = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    order = np.argsort(luminance)
+    centers = pixels[order[np.linspace(0, len(pixels) - 1, k).astype(int)]]
+
+    for _ in range(iterations):
+        distances = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack(
+            [np.bincount(labels, weights=pixels[:, c], minlength=k) for c in range(3)],
+            axis=1,
+        )
+        filled = counts > 0
+        updated = centers.copy()
+        updated[filled] = sums[filled] / counts[filled, None]
+        if np.allclose(updated, centers, atol=0.5):
+            centers = updated
+            break
+        centers = updated
+
+    weights = counts / counts.sum()
+    keep = weights > 0
+    return centers[keep], weights[keep]
+
+
+def parse_image(content):
+    """Dominant colors of an image after downsampling"""
+    image = Image.open(io.BytesIO(content))  # Reads the header only
+    width, height = image.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"Image too large to decode ({width}x{height})")
+    # JPEGs can be decoded at a reduced scale, which skips most of the work
+    image.draft("RGB", (IMAGE_SAMPLE_SIZE, IMAGE_SAMPLE_SIZE))
+    image = image.convert("RGBA")
+    image.thumbnail((IMAGE_SAMPLE_SIZE, IMAGE_SAMPLE_SIZE))
+    pixels = np.asarray(image, dtype=np.uint8).reshape(-1, 4)
+    pixels = pixels[pixels[:, 3] >= 128, :3]  # Ignore transparent areas
+
+    centers, weights = quantize_colors(pixels)
     return {
-        "color_palette": {
-            "primary": "#8A78EE",  # Purple
-            "secondary": "#6c63a3",  # Darker purple
-            "accent": "#f87171",  # Red
-        },
+        "colors": {
+            "#{:02x}{:02x}{:02x}".format(*np.clip(center, 0, 255).round().astype(int)): float(weight)
+            for center, weight in zip(centers, weights)
+        }
+    }
+
+
+def _fetch_asset(url, deadline):
+    """Download a bounded asset or return None"""
+    try:
+        return fetch_bounded(
+            url,
+            MAX_ASSET_BYTES,
+            timeout=timeout_for(deadline, ASSET_TIMEOUT, "visual_profile"),
+        )
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        return None
+
+
+def _hex_to_rgb(value):
+    return np.array([int(value[i : i + 2], 16) for i in (1, 3, 5)], dtype=np.float32)
+
+
+def _is_chromatic(rgb):
+    hue, lightness, saturation = colorsys.rgb_to_hls(*(rgb / 255.0))
+    return saturation > 0.2 and 0.12 < lightness < 0.9
+
+
+def _hue_distance(a, b):
+    ha = colorsys.rgb_to_hls(*(a / 255.0))[0]
+    hb = colorsys.rgb_to_hls(*(b / 255.0))[0]
+    distance = abs(ha - hb)
+    return min(distance, 1 - distance)
+
+
+def build_palette(css_colors, image_colors):
+    """Pick primary, secondary and accent colors from weighted CSS and image colors"""
+    weighted = Counter()
+    both = bool(css_colors) and bool(image_colors)
+    for source, share in ((css_colors, 0.6), (image_colors, 0.4)):
+        total = sum(source.values())
+        if not total:
+            continue
+        share = share if both else 1.0
+        for color, weight in source.items():
+            weighted[color] += share * weight / total
+
+    candidates = [
+        (color, _hex_to_rgb(color), weight)
+        for color, weight in weighted.most_common(40)
+        if _is_chromatic(_hex_to_rgb(color))
+    ]
+    if not candidates:
+        return None
+
+    primary = candidates[0]
+    others = [
+        c for c in candidates[1:] if np.linalg.norm(c[1] - primary[1]) > 40
+    ]
+    secondary = others[0] if others else None
+    accent = max(others[1:], key=lambda c: _hue_distance(c[1], primary[1]), default=None)
+
+    palette = dict(DEFAULT_PALETTE)
+    palette["primary"] = primary[0]
+    if secondary:
+        palette["secondary"] = secondary[0]
+    if accent:
+        palette["accent"] = accent[0]
+    return palette
+
+
+def collect_asset_styles(website_content, deadline=None):
+    """Fetch and parse a bounded set of stylesheets and images for a site"""
+    assets = (website_content or {}).get("assets") or {}
+    css_colors, image_colors, fonts = Counter(), Counter(), Counter()
+
+    inline = assets.get("inline_css")
+    if inline:
+        parsed = _cached("css", inline.encode("utf-8"), parse_css)
+        css_colors.update(parsed["colors"])
+        fonts.update(parsed["fonts"])
+
+    try:
+        for url in assets.get("stylesheets", [])[:MAX_STYLESHEETS]:
+            content = _fetch_asset(url, deadline)
+            if content:
+                parsed = _cached("css", content, parse_css)
+                css_colors.update(parsed["colors"])
+                fonts.update(parsed["fonts"])
+
+        for url in assets.get("images", [])[:MAX_IMAGES]:
+            content = _fetch_asset(url, deadline)
+            if not content:
+                continue
+            try:
+                parsed = _cached("image", content, parse_image)
+            except Exception:
+                continue  # Unsupported format such as SVG, or too large to decode
+            image_colors.update(parsed["colors"])
+    except DeadlineExceeded:
+        pass
+
+    return css_colors, image_colors, fonts
+
+
+def generate_visual_profile(analysis, website_content=None, deadline=None):
+    """Derive a visual profile (palette, fonts) from the site's own assets"""
+    palette, font_names = None, []
+    if deadline and not deadline.has_budget(MIN_VISUAL_BUDGET):
+        deadline.mark_truncated("visual_profile")
+    else:
+        css_colors, image_colors, fonts = collect_asset_styles(
+            website_content, deadline
+        )
+        palette = build_palette(css_colors, image_colors)
+        font_names = [name for name, _ in fonts.most_common(2)]
+
+    heading = font_names[0] if font_names else DEFAULT_FONT
+    body = font_names[1] if len(font_names) > 1 else heading
+    serif = any(hint in heading.lower() for hint in SERIF_HINTS) and "sans" not in heading.lower()
+
+    return {
+        "color_palette": palette or dict(DEFAULT_PALETTE),
         "font_style": {
-            "heading": "Poppins",
-            "body": "Poppins",
-            "style": "Clean with medium contrast for dark backgrounds",
+            "heading": heading,
+            "body": body,
+            "style": (
+                f"{'Serif' if serif else 'Sans-serif'} typography taken from the site's stylesheets"
+                if font_names
+                else "Clean with medium contrast for dark backgrounds"
+            ),
         },
         "tone_indicators": [
             {"name": tone.capitalize(), "value": round(value, 2)}
@@ -19,10 +325,54 @@ def generate_visual_profile(analysis):
                 reverse=True,
             )[:3]
         ],
-        "image_style": "High contrast imagery with bold colors that stand out against dark backgrounds",
+        "image_style": DEFAULT_IMAGE_STYLE,
+        "derived_from_site": bool(palette or font_names),
     }
 
 
-def generate_consistency_score(website_content, social_content, analysis):
-    """Generate a simple consistency score between 65-85"""
-    return 75  # Fixed value for simplicity
+def _social_text(profile):
+    """What a platform profile says about the brand (bio and real content, not the handle)"""
+    content = profile.get("content") or ""
+    if content.startswith("Content from"):
+        content = ""  # Placeholder written by the scrapers, not real content
+    return " ".join(part for part in (profile.get("bio"), content) if part)
+
+
+def generate_consistency_score(website_content, social_content, analysis, url=None):
+    """Score (50-100) how consistently the brand presents itself across channels
+
+    The website text and each platform's bio/content are reduced to fixed-size
+    sketches (MinHash, SimHash, keyword set) and compared. Sketches are stored
+    per URL so re-analyses and cross-brand comparisons can reuse them.
+    Returns NEUTRAL_CONSISTENCY when there is nothing to compare.
+    """
+    brand_name = website_content.get("brand_name", "")
+    site = build_sketch(
+        " ".join(
+            [brand_name, website_content.get("description", ""), website_content.get("content", "")]
+        )
+    )
+    if url and site:
+        save_sketch(url, "website", site)
+
+    scores = []
+    for profile in social_content:
+        text = _social_text(profile)
+        sketch = build_sketch(" ".join(part for part in (profile.get("username"), text) if part))
+        if not sketch:
+            continue
+        if url:
+            save_sketch(url, f"social:{profile.get('platform', '').lower()}", sketch)
+        if not site:
+            continue
+
+        score = similarity(site, sketch)
+        # Naming the brand in a bio is a strong consistency signal on short profiles;
+        # the handle doesn't count, since it matches the brand on most profiles
+        if brand_name and brand_name.lower() in text.lower():
+            score += 0.2
+        scores.append(min(1.0, score))
+
+    if not scores:
+        return NEUTRAL_CONSISTENCY
+    return int(round(50 + 50 * sum(scores) / len(scores)))
@@ -0,0 +1,241 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+
+from utils.storage import data_path
+
+# Seconds a claimed job stays invisible to other workers before it can be reclaimed
+VISIBILITY_TIMEOUT = float(os.environ.get("NARRATIX_QUEUE_VISIBILITY", "120"))
+MAX_ATTEMPTS = int(os.environ.get("NARRATIX_QUEUE_MAX_ATTEMPTS", "3"))
+# Waiting jobs allowed before new submissions are rejected
+MAX_DEPTH = int(os.environ.get("NARRATIX_QUEUE_MAX_DEPTH", "1000"))
+# Base delay before a failed job is retried; doubles with each attempt (seconds)
+RETRY_BACKOFF = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (queue, status, available_at);
+"""
+
+
+class WorkQueue:
+    """Durable job queue on a SQLite file that many worker processes can share
+
+    Jobs move through queued -> leased -> done, or back to queued for a retry,
+    or to dead after max_attempts failures. A leased job whose lease expires
+    (worker crashed or stalled) becomes claimable again. Point several hosts
+    at the same file on a shared filesystem to spread work across nodes.
+    """
+
+    def __init__(self, path=None, queue="analyze", visibility_timeout=VISIBILITY_TIMEOUT):
+        self.path = path or os.environ.get("NARRATIX_QUEUE_PATH") or data_path("workqueue.db")
+        self.queue = queue
+        self.visibility_timeout = visibility_timeout
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per operation keeps processes independent
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, payload, max_attempts=MAX_ATTEMPTS, delay=0):
+        """Add a job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO jobs (id, queue, payload, status, max_attempts, available_at, created_at)
+                VALUES (?, ?, ?, 'queued', ?, ?, ?)""",
+                (job_id, self.queue, json.dumps(payload), max_attempts, now + delay, now),
+            )
+        return job_id
+
+    def claim(self, worker_id, visibility_timeout=None):
+        """Lease the oldest available job for this worker, or return None"""
+        visibility_timeout = visibility_timeout or self.visibility_timeout
+        now = time.time()
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock, so two workers never lease the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = conn.execute(
+                        """SELECT * FROM jobs WHERE queue = ? AND (
+                            (status = 'queued' AND available_at <= ?)
+                            OR (status = 'leased' AND lease_expires <= ?))
+                        ORDER BY available_at LIMIT 1""",
+                        (self.queue, now, now),
+                    ).fetchone()
+                    if row is None or not (
+                        row["status"] == "leased" and row["attempts"] >= row["max_attempts"]
+                    ):
+                        break
+                    # The lease ran out on the final attempt: dead-letter and look again
+                    conn.execute(
+                        """UPDATE jobs SET status = 'dead', error = ?, lease_owner = NULL,
+                        finished_at = ? WHERE id = ?""",
+                        ("Lease expired on final attempt", now, row["id"]),
+                    )
+
+                if row is not None:
+                    conn.execute(
+                        """UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                        attempts = attempts + 1 WHERE id = ?""",
+                        (worker_id, now + visibility_timeout, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "payload": json.loads(row["payload"]),
+            "attempt": row["attempts"] + 1,
+            "max_attempts": row["max_attempts"],
+        }
+
+    def extend_lease(self, job_id, worker_id, visibility_timeout=None):
+        """Keep a long-running job invisible; False if the lease was lost"""
+        visibility_timeout = visibility_timeout or self.visibility_timeout
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased'
+                AND lease_owner = ?""",
+                (time.time() + visibility_timeout, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, result):
+        """Store a job's result; ignored if another worker has taken over the lease"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL,
+                finished_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (json.dumps(result), time.time(), job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """Schedule a retry with exponential backoff, or dead-letter the job
+
+        Returns False (and changes nothing) if this worker no longer holds the lease.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # Read and write under one write lock so a reclaimed lease can't be clobbered
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    """SELECT attempts, max_attempts FROM jobs
+                    WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                    (job_id, worker_id),
+                ).fetchone()
+                if row is not None and row["attempts"] >= row["max_attempts"]:
+                    conn.execute(
+                        """UPDATE jobs SET status = 'dead', error = ?, lease_owner = NULL,
+                        finished_at = ? WHERE id = ?""",
+                        (error, now, job_id),
+                    )
+                elif row is not None:
+                    delay = RETRY_BACKOFF * 2 ** (row["attempts"] - 1)
+                    conn.execute(
+                        """UPDATE jobs SET status = 'queued', error = ?, lease_owner = NULL,
+                        available_at = ? WHERE id = ?""",
+                        (error, now + delay, job_id),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    def get(self, job_id):
+        """A job's current state, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "payload": json.loads(row["payload"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    def wait(self, job_id, timeout, poll_interval=0.5):
+        """Return the job once it finishes or the timeout elapses (long-poll)"""
+        give_up = time.time() + timeout
+        job = self.get(job_id)
+        while job and job["status"] in ("queued", "leased") and time.time() < give_up:
+            time.sleep(min(poll_interval, max(give_up - time.time(), 0)))
+            job = self.get(job_id)
+        return job
+
+    def dead_letters(self, limit=50):
+        """Jobs that exhausted their attempts"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """SELECT id FROM jobs WHERE queue = ? AND status = 'dead'
+                ORDER BY finished_at DESC LIMIT ?""",
+                (self.queue, limit),
+            ).fetchall()
+        return [self.get(row["id"]) for row in rows]
+
+    def requeue(self, job_id):
+        """Give a dead-lettered job a fresh set of attempts"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?,
+                error = NULL WHERE id = ? AND status = 'dead'""",
+                (time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def depth(self):
+        """Jobs waiting to be claimed, including ones scheduled for a retry"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE queue = ? AND status = 'queued'",
+                (self.queue,),
+            ).fetchone()
+        return row[0]
+
+    def stats(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS count FROM jobs WHERE queue = ? GROUP BY status",
+                (self.queue,),
+            ).fetchall()
+        counts = {"queued": 0, "leased": 0, "done": 0, "dead": 0}
+        counts.update({row["status"]: row["count"] for row in rows})
+        return counts
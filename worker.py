@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Standalone analysis worker.
+
+Claims jobs from the shared work queue and runs the full pipeline (crawler,
+socials, analyzer, LLM stages) for each. Start as many as you like, on one
+machine or several that share the queue file:
+
+    NARRATIX_QUEUE_PATH=/shared/narratix/workqueue.db python worker.py
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+
+from utils.workqueue import WorkQueue
+from utils.pipeline import run_analysis
+from utils.crawler import normalize_url
+
+# Seconds to sleep when the queue is empty
+POLL_INTERVAL = 1.0
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def heartbeat(queue, job_id, worker_id, stop):
+    """Extend the lease while the job runs so no other worker reclaims it"""
+    interval = queue.visibility_timeout / 3
+    while not stop.wait(interval):
+        if not queue.extend_lease(job_id, worker_id):
+            return  # Lease lost; the result will be discarded by complete()
+
+
+def process(queue, job, worker_id):
+    """Run one claimed job and report its outcome to the queue"""
+    payload = job["payload"]
+    stop = threading.Event()
+    beat = threading.Thread(
+        target=heartbeat, args=(queue, job["id"], worker_id, stop), daemon=True
+    )
+    beat.start()
+    try:
+        result = run_analysis(normalize_url(payload["url"]), payload.get("degraded", False))
+    except Exception as e:
+        queue.fail(job["id"], worker_id, str(e))
+        print(f"Job {job['id']} failed (attempt {job['attempt']}/{job['max_attempts']}): {str(e)}")
+        return False
+    finally:
+        stop.set()
+
+    if not queue.complete(job["id"], worker_id, result):
+        print(f"Job {job['id']} finished after its lease was lost; result discarded")
+        return False
+    print(f"Job {job['id']} done: {payload['url']}")
+    return True
+
+
+def run_worker(queue, worker_id, poll_interval=POLL_INTERVAL, once=False):
+    """Claim and process jobs until stopped (or until the queue is empty with once=True)"""
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        process(queue, job, worker_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Narratix analyses from the shared work queue")
+    parser.add_argument("--queue-path", help="Queue database (default: NARRATIX_QUEUE_PATH or the data dir)")
+    parser.add_argument("--worker-id", default=default_worker_id())
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="Seconds between polls when idle")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.queue_path)
+    print(f"Worker {args.worker_id} polling {queue.path}")
+    try:
+        run_worker(queue, args.worker_id, args.poll, args.once)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())